@@ -0,0 +1,82 @@
+"""Compare solving Boggle boards with the bitboard search against the path search,
+and re-solving a board after changing a cell with the incremental solution against
+solving it again.
+
+    python -m benchmarks.boggle_solve [DICTIONARY]
+
+DICTIONARY defaults to PYWORD_DICTIONARY.
+"""
+import os
+import random
+import sys
+from functools import partial
+from time import perf_counter
+from timeit import repeat
+from typing import Callable, Iterator, List, Tuple
+
+from pyword import boggle, compact, trie
+
+# Letters weighted by their frequency in English so boards have plenty of words.
+LETTERS = "eeeeeeeeeeeeaaaaaaaaariiiiiiiooooooottttttnnnnnnssssssllllllccccuuuudddpppmmmhhhggbbffyywkvxzjq"  # noqa: E501
+
+
+Solve = Callable[
+    [trie.Node[str], boggle.Grid], Iterator[Tuple[Tuple[str, ...], boggle.Path]]
+]
+
+
+def solve(
+    dct: trie.Node[str], g: boggle.Grid
+) -> Iterator[Tuple[Tuple[str, ...], boggle.Path]]:
+    # boggle.solve as it was, looking for each cell in the path.
+    s: List[Tuple[boggle.Path, trie.Node]] = [
+        ((c,), u) for c in g if (u := boggle.step(dct, g[c])) is not None
+    ]
+    while s:
+        p, u = s.pop()
+        if u.ok:
+            yield tuple(g[c] for c in p), p
+        for c, w in g.adj(p[-1]):
+            if c not in p and (v := boggle.step(u, w)) is not None:
+                s.append(((*p, c), v))
+
+
+def board(size: int, rng: random.Random) -> boggle.Grid:
+    return boggle.Grid.from_rows(
+        [[rng.choice(LETTERS) for _ in range(size)] for _ in range(size)]
+    )
+
+
+def count(dct: trie.Node[str], boards: List[boggle.Grid], f: Solve) -> int:
+    return sum(1 for g in boards for _ in f(dct, g))
+
+
+def main(path: str) -> None:
+    dct = compact.load(path)
+    rng = random.Random(0)
+    for size in (4, 5, 6):
+        boards = [board(size, rng) for _ in range(20)]
+        for g in boards:
+            assert list(boggle.solve(dct, g)) == list(solve(dct, g))
+        for label, f in (("path", solve), ("bitboard", boggle.solve)):
+            t = min(repeat(partial(count, dct, boards, f), number=1, repeat=3))
+            print(f"{size}x{size} {label:11} {t / len(boards) * 1000:.2f}ms/board")
+
+        g = boards[0]
+        sol = boggle.Solution.watch(dct, g)
+        edits = [(rng.choice(list(g)), rng.choice(LETTERS)) for _ in range(100)]
+        full = incremental = 0.0
+        for k, c in edits:
+            t = perf_counter()
+            g[k] = c
+            incremental += perf_counter() - t
+            t = perf_counter()
+            want = set(boggle.solve(dct, g))
+            full += perf_counter() - t
+            assert set(sol.solve()) == want
+        for label, t in (("solve", full), ("incremental", incremental)):
+            print(f"{size}x{size} {label:11} {t / len(edits) * 1000:.2f}ms/edit")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.environ["PYWORD_DICTIONARY"])
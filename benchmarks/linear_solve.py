@@ -0,0 +1,67 @@
+"""Compare word search by line scanning and by Aho-Corasick automaton against
+stepping cell by cell.
+
+    python -m benchmarks.linear_solve [DICTIONARY]
+
+DICTIONARY defaults to PYWORD_DICTIONARY.
+"""
+import os
+import random
+import string
+import sys
+from functools import partial
+from timeit import repeat
+from typing import Callable, Iterator, List, Tuple
+
+from pyword import compact, linear, trie
+
+Solve = Callable[[trie.Node, linear.Grid], Iterator[linear.Word]]
+
+
+def solve(dct: trie.Node, grid: linear.Grid) -> Iterator[linear.Word]:
+    # linear.solve as it was, stepping through the grid a cell at a time.
+    todo: List[Tuple[trie.Node, linear.YX, linear.Word]] = []
+    for yx0, char0 in grid.items():
+        if (v := dct.next.get(char0)) is not None:
+            todo.append((v, (0, 0), (yx0,)))
+    while todo:
+        u, dyx, path = todo.pop()
+        if u.ok:
+            yield path
+        yx0 = path[-1]
+        for dyx in linear.ORIENTATIONS if len(path) == 1 else {dyx}:  # noqa: B020
+            yx1 = linear.yx_add(yx0, dyx)
+            if char1 := grid.get(yx1):
+                if (v := u.next.get(char1)) is not None:
+                    todo.append((v, dyx, (*path, yx1)))
+
+
+def count(dct: trie.Node, grid: linear.Grid, f: Solve) -> int:
+    return sum(1 for _ in f(dct, grid))
+
+
+def main(path: str) -> None:
+    dct = compact.load(path)
+    automaton = linear.Automaton(dct)
+
+    def search(dct: trie.Node, grid: linear.Grid) -> Iterator[linear.Word]:
+        return map(linear.cells, linear.search(automaton, grid))
+
+    rng = random.Random(0)
+    for size in (25, 100, 300):
+        grid = linear.Grid(
+            *("".join(rng.choices(string.ascii_lowercase, k=size)) for _ in range(size))
+        )
+        assert set(linear.solve(dct, grid)) == set(solve(dct, grid))
+        assert set(search(dct, grid)) == set(solve(dct, grid))
+        for label, f in (
+            ("cells", solve),
+            ("lines", linear.solve),
+            ("automaton", search),
+        ):
+            t = min(repeat(partial(count, dct, grid, f), number=1, repeat=3))
+            print(f"{size}x{size} {label:9} {t * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.environ["PYWORD_DICTIONARY"])
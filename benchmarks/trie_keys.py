@@ -0,0 +1,57 @@
+"""Compare enumerating dictionary words against building a tuple per node.
+
+    python -m benchmarks.trie_keys [WORDS]
+
+WORDS defaults to PYWORD_DICTIONARY and must be a file of words.
+"""
+import os
+import sys
+from functools import partial
+from timeit import repeat
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+from pyword import compact, trie
+
+
+def nodes(u: trie.Node[str]) -> Iterator[Tuple[Sequence[str], trie.Node[str]]]:
+    # Node.nodes as it was, building a new tuple for every node.
+    s: List[Tuple[Tuple[str, ...], trie.Node[str]]] = [
+        ((c,), v) for c, v in u.next.items()
+    ]
+    while s:
+        wu = s.pop()
+        yield wu
+        w, v = wu
+        for c, x in v.next.items():
+            s.append(((*w, c), x))
+
+
+def words(u: trie.Node[str]) -> Iterator[str]:
+    for w, v in nodes(u):
+        if v.ok:
+            yield "".join(w)
+
+
+def count(it: Callable[[], Iterator[str]]) -> int:
+    return sum(1 for _ in it())
+
+
+def main(path: str) -> None:
+    with open(path) as f:
+        keys = [line.strip() for line in f]
+
+    for name, dct in (
+        ("trie", trie.Node.from_keys(keys)),
+        ("compact", compact.Node.from_keys(keys)),
+    ):
+        for label, it in (
+            ("tuple per node", partial(words, dct)),
+            ("words", dct.words),
+            ("words ordered", partial(dct.words, ordered=True)),
+        ):
+            t = min(repeat(partial(count, it), number=1, repeat=5))
+            print(f"{name:8} {label:16} {t:.3f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.environ["PYWORD_DICTIONARY"])
@@ -1,9 +1,34 @@
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import random
 import sys
-from typing import Dict, Iterator, List, MutableMapping, Optional, TextIO, Tuple
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from multiprocessing.queues import Queue
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+)
 
 import click
 
-from . import trie
+from . import client, compact, trie
 
 
 class TokenError(Exception):
@@ -26,11 +51,24 @@ class Grid(MutableMapping[Tuple[int, int], str]):
     def __init__(self, size: Tuple[int, int] = (4, 4)):
         self.size = size
         self.chars: Dict[Tuple[int, int], str] = {}
+        # Called with the co-ords and char of each cell set.
+        self.watchers: List[Callable[[Tuple[int, int], str], None]] = []
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[str]]) -> "Grid":
+        if len({len(row) for row in rows}) != 1:
+            raise ValueError("uneven row sizes")
+        g = cls(size=(len(rows[0]), len(rows)))
+        for x, y in g:
+            g[x, y] = rows[y][x]
+        return g
 
     def __setitem__(self, k: Tuple[int, int], v: str) -> None:
         if 0 > k[0] >= self.size[0] or 0 > k[1] >= self.size[1]:
             raise KeyError(f"{k} not in bounds of {self.size}")
         self.chars[k] = v
+        for watch in self.watchers:
+            watch(k, v)
 
     def __delitem__(self, k: Tuple[int, int]) -> None:
         del self.chars[k]
@@ -63,24 +101,130 @@ class Grid(MutableMapping[Tuple[int, int], str]):
                 yield a, self[a]
 
 
+def faces(dice: str) -> Tuple[Tuple[str, ...], ...]:
+    # Dice are separated by spaces and their faces are tokens, or separated by / where
+    # any is more than one char.
+    return tuple(tuple(d.split("/") if "/" in d else tokenize(d)) for d in dice.split())
+
+
+# Standard dice sets by name. A face of # is blank.
+DICE = {
+    "classic": faces(
+        "aaciot abilty abjmoqu acdemp acelrs adenvz ahmors biforx denosw dknotu eefhiy "
+        "egkluy egintv ehinps elpstu gilruw"
+    ),
+    "new": faces(
+        "aaeegn abbjoo achops affkps aoottw cimotu deilrx delrvy distty eeghnw eeinsu "
+        "ehrtvw eiosst elrtty himnquu hlnnrz"
+    ),
+    "big": faces(
+        "aaafrs aaeeee aafirs adennn aeeeem aeegmu aegmnn afirsy bjkquxz ccnstw ceiilt "
+        "ceilpt ceipst ddlnor dhhlor dhhnot dhlnor eiiitt emottt ensssu fiprsy gorrvw "
+        "hiprry nootuw ooottu"
+    ),
+    "super-big": faces(
+        "aaafrs aaeeee aaeeoo aafirs abdeio adennn aeeeem aeegmu aegmnn aeilmn aeinou "
+        "afirsy an/er/he/in/qu/th bbjkxz ccenst cddlnn ceiitt ceipst cfgnuy ddhnot "
+        "dhhlor dhhnow dhlnor ehilrs eiilst eilpst eio### emttto ensssu gorrvw hirstv "
+        "hoprst iprsyy jk/qu/wx/z/#/# nootuw ooottu"
+    ),
+}
+
+
+def roll(
+    dice: Sequence[Sequence[str]], rng: Optional[random.Random] = None
+) -> List[List[str]]:
+    """Shake a square set of dice into a board and return its rows."""
+    rng = rng or random.Random()
+    width = math.isqrt(len(dice))
+    tiles = [rng.choice(die) for die in rng.sample(dice, len(dice))]
+    rows = []
+    for start in range(0, len(tiles), width):
+        end = start + width
+        rows.append(tiles[start:end])
+    return rows
+
+
 Path = Tuple[Tuple[int, int], ...]
 
 
+def step(u: trie.Node[str], tile: str) -> Optional[trie.Node[str]]:
+    # Tiles like "qu" are one edge in a dictionary of tokens but a path of edges in a
+    # dictionary of chars e.g. a compiled one.
+    if (v := u.next.get(tile)) is None and len(tile) > 1:
+        v = u.node(tile)
+    return v
+
+
+class Board:
+    """A grid with its cells numbered in row, col order and their neighbours listed.
+
+    Cells are numbered so that the cells on a path can be kept as the bits of an int
+    rather than looked for in the path.
+    """
+
+    def __init__(self, g: Grid) -> None:
+        self.size = g.size
+        self.cells = list(g)
+        number = {c: i for i, c in enumerate(self.cells)}
+        self.tiles = [g[c] for c in self.cells]
+        self.adj = [[number[a] for a, _ in g.adj(c)] for c in self.cells]
+
+    def search(self, dct: trie.Node[str]) -> Iterator[List[int]]:
+        """Yield the cells of each path that spells a word.
+
+        The path is the same list each time, changed in place as the search goes on,
+        so copy it to keep it.
+        """
+        tiles = self.tiles
+        # Neighbours are searched last to first so words are found in the order they
+        # would be by pushing them all onto a stack.
+        adj = [ns[::-1] for ns in self.adj]
+        path: List[int] = []
+        for i in reversed(range(len(tiles))):
+            if (u := step(dct, tiles[i])) is None:
+                continue
+            path.append(i)
+            used = 1 << i
+            if u.ok:
+                yield path
+            # Each node's edges are looked up once for all its neighbours.
+            todo = [(iter(adj[i]), u, u.next)]
+            while todo:
+                it, u, edges = todo[-1]
+                for j in it:
+                    if used >> j & 1:
+                        continue
+                    tile = tiles[j]
+                    if (v := edges.get(tile)) is None and len(tile) > 1:
+                        v = u.node(tile)
+                    if v is not None:
+                        path.append(j)
+                        used |= 1 << j
+                        if v.ok:
+                            yield path
+                        todo.append((iter(adj[j]), v, v.next))
+                        break
+                else:
+                    todo.pop()
+                    used ^= 1 << path.pop()
+
+    def rows(self) -> List[List[str]]:
+        width = self.size[0]
+        rows = []
+        for start in range(0, len(self.tiles), width):
+            end = start + width
+            rows.append(self.tiles[start:end])
+        return rows
+
+    def solve(self, dct: trie.Node[str]) -> Iterator[Tuple[Tuple[str, ...], Path]]:
+        tiles, cells = self.tiles, self.cells
+        for path in self.search(dct):
+            yield tuple(tiles[i] for i in path), tuple(cells[i] for i in path)
+
+
 def solve(dct: trie.Node[str], g: Grid) -> Iterator[Tuple[Tuple[str, ...], Path]]:
-    # Seed search with words starting with chars at each grid position.
-    s: List[Tuple[Path, trie.Node]] = [
-        ((c,), u) for c in g if (u := dct.next.get(g[c])) is not None
-    ]
-    while s:
-        p, u = s.pop()
-        # Solution if is a word.
-        if u.ok:
-            # Extract word from grid using path.
-            yield tuple(g[c] for c in p), p
-        # Extend search with next chars from unused adjacent.
-        for c, w in g.adj(p[-1]):
-            if c not in p and (v := u.next.get(w)) is not None:
-                s.append(((*p, c), v))
+    return Board(g).solve(dct)
 
 
 def score(w: str) -> int:
@@ -97,38 +241,127 @@ def score(w: str) -> int:
     return 11
 
 
-@click.command()
-@click.option("--dictionary", "-d", type=click.File("r"), envvar="PYWORD_DICTIONARY")
-@click.argument("rows", type=str, nargs=-1)
-def cli(dictionary: Optional[TextIO], rows: List[str]) -> None:
-    if dictionary is None:
-        raise Exception("no dictionary provided")
-    if not rows:
-        raise Exception("no grid provided")
+class Solution:
+    """Words on a board, kept up to date as its tiles change.
 
-    chars = [list(tokenize(row.lower())) for row in rows]
-    if len({len(row) for row in rows}) != 1:
-        raise Exception("uneven row sizes")
-    w, h = len(chars[0]), len(chars)
+    Every path that spells the prefix of a word is kept with its node and the cells
+    it uses as bits of an int, indexed by the cell it ends at and linked to the paths
+    extending it. The paths through a cell are those ending at it and all that extend
+    them, so changing a tile only drops those and extends the paths ending next to it
+    through it again.
+    """
+
+    def __init__(self, dct: trie.Node[str], board: Board) -> None:
+        self.dct = dct
+        self.board = board
+        self.prefixes: Dict[Tuple[int, ...], Tuple[trie.Node[str], int]] = {}
+        # Paths ending at each cell, and the paths one cell longer than each path.
+        self.ending: List[Set[Tuple[int, ...]]] = [set() for _ in board.cells]
+        self.longer: Dict[Tuple[int, ...], List[Tuple[int, ...]]] = {}
+        # Paths of each word so a word's score only goes when its last path does.
+        self.counts: Dict[str, int] = {}
+        self.score = 0
+        self.grow([((), dct, 0)], range(len(board.cells)))
+
+    @classmethod
+    def watch(cls, dct: trie.Node[str], g: Grid) -> "Solution":
+        """Solve a grid and keep the solution up to date as its cells are set."""
+        sol = cls(dct, Board(g))
+        number = {c: i for i, c in enumerate(sol.board.cells)}
+
+        def changed(k: Tuple[int, int], v: str) -> None:
+            if (i := number.get(k)) is not None:
+                sol[i] = v
+
+        g.watchers.append(changed)
+        return sol
+
+    def paths(self) -> Iterator[Tuple[int, ...]]:
+        for p, (u, _) in self.prefixes.items():
+            if u.ok:
+                yield p
 
-    g = Grid(size=(w, h))
-    for x, y in g:
-        g[x, y] = chars[y][x]
+    def solve(self) -> Iterator[Tuple[Tuple[str, ...], Path]]:
+        tiles, cells = self.board.tiles, self.board.cells
+        for p in self.paths():
+            yield tuple(tiles[i] for i in p), tuple(cells[i] for i in p)
+
+    def grow(
+        self,
+        todo: List[Tuple[Tuple[int, ...], trie.Node[str], int]],
+        cells: Iterable[int],
+    ) -> None:
+        # Extend each path into the given cells and then on into any others.
+        tiles, adj = self.board.tiles, self.board.adj
+        prefixes, ending, longer = self.prefixes, self.ending, self.longer
+        nexts = [cells] * len(todo)
+        while todo:
+            p, u, used = todo.pop()
+            edges = u.next
+            for j in nexts.pop():
+                if used >> j & 1:
+                    continue
+                tile = tiles[j]
+                if (v := edges.get(tile)) is None and len(tile) > 1:
+                    v = u.node(tile)
+                if v is None:
+                    continue
+                q = (*p, j)
+                prefixes[q] = v, used | 1 << j
+                ending[j].add(q)
+                longer[q] = []
+                if p:
+                    longer[p].append(q)
+                if v.ok:
+                    word = "".join(tiles[i] for i in q)
+                    if (n := self.counts.get(word, 0)) == 0:
+                        self.score += score(word)
+                    self.counts[word] = n + 1
+                todo.append((q, v, used | 1 << j))
+                nexts.append(adj[j])
+
+    def __setitem__(self, i: int, tile: str) -> None:
+        tiles = self.board.tiles
+        if tiles[i] == tile:
+            return
+        todo = list(self.ending[i])
+        for p in todo:
+            if len(p) > 1:
+                self.longer[p[:-1]].remove(p)
+        while todo:
+            p = todo.pop()
+            self.ending[p[-1]].discard(p)
+            todo.extend(self.longer.pop(p))
+            if self.prefixes.pop(p)[0].ok:
+                word = "".join(tiles[j] for j in p)
+                if (n := self.counts[word]) == 1:
+                    self.score -= score(word)
+                    del self.counts[word]
+                else:
+                    self.counts[word] = n - 1
+        tiles[i] = tile
+        found = [
+            (p, *self.prefixes[p]) for j in self.board.adj[i] for p in self.ending[j]
+        ]
+        found.append(((), self.dct, 0))
+        self.grow(found, (i,))
+
+
+def load_dictionary(dictionary: Optional[str]) -> trie.Node[str]:
+    if dictionary is None:
+        raise Exception("no dictionary provided")
 
     print("loading dictionary...", end="", file=sys.stderr, flush=True)
     ignored = 0
-    dct: trie.Node[str] = trie.Node()
-    for word in dictionary:
-        word = word.strip().lower()
-        try:
-            dct.add(tokenize(word))
-        except TokenError:
-            ignored += 1
-            print(
-                f"impossible word {word} ignored ({ignored})",
-                file=sys.stderr,
-                flush=True,
-            )
+
+    def ignore(word: str) -> None:
+        nonlocal ignored
+        ignored += 1
+        print(
+            f"impossible word {word} ignored ({ignored})", file=sys.stderr, flush=True
+        )
+
+    dct = compact.load(dictionary, lambda lines: tokens(lines, ignore))
     if ignored:
         print("loading dictionary", end="", file=sys.stderr, flush=True)
     print(
@@ -136,13 +369,301 @@ def cli(dictionary: Optional[TextIO], rows: List[str]) -> None:
         file=sys.stderr,
         flush=True,
     )
+    return dct
+
+
+def rate(dct: trie.Node[str], g: Grid) -> Tuple[int, int]:
+    """Return the number of words on a board and their total score."""
+    words = {"".join(chars) for chars, _ in solve(dct, g)}
+    return len(words), sum(score(w) for w in words)
+
+
+def tokens(
+    lines: Iterable[str], ignore: Callable[[str], None] = lambda word: None
+) -> Iterator[Tuple[str, ...]]:
+    """Yield the tokens of each word, passing those that cannot be tokens to ignore."""
+    for word in compact.lowercase(lines):
+        try:
+            yield tuple(tokenize(word))
+        except TokenError:
+            ignore(word)
+
+
+Rows = Sequence[Sequence[str]]
+
+# Dictionary of a batch worker process.
+worker_dct: Optional[trie.Node[str]] = None
+
+
+def init_worker(dictionary: str) -> None:
+    global worker_dct
+    worker_dct = compact.load(dictionary, tokens)
+
+
+def rate_worker(boards: List[Rows]) -> List[Tuple[int, int]]:
+    assert worker_dct is not None
+    return [rate(worker_dct, Grid.from_rows(rows)) for rows in boards]
+
+
+def batch(
+    dictionary: str,
+    boards: Iterable[Rows],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+) -> Iterator[Tuple[int, int]]:
+    """Rate boards in worker processes, yielding the ratings in the order given.
+
+    Each worker loads the dictionary itself so give a compiled one, which loads
+    instantly and whose pages are shared between the workers as it is mapped into
+    memory. Boards are read only as fast as they are rated.
+    """
+    workers = workers or os.cpu_count() or 1
+    it = iter(boards)
+    with ProcessPoolExecutor(
+        workers, initializer=init_worker, initargs=(dictionary,)
+    ) as pool:
+        # Keep every worker busy with the next chunk without queueing every board.
+        todo: Deque[Future[List[Tuple[int, int]]]] = deque()
+        while True:
+            while len(todo) < 2 * workers:
+                if not (chunk := list(islice(it, chunksize))):
+                    break
+                todo.append(pool.submit(rate_worker, chunk))
+            if not todo:
+                return
+            yield from todo.popleft().result()
+
+
+# Tiles of an optimized board. As on the dice q only comes as qu.
+TILES = (*"abcdefghijklmnop", "qu", *"rstuvwxyz")
+
+
+def anneal(
+    dct: trie.Node[str],
+    size: Tuple[int, int] = (4, 4),
+    steps: int = 10000,
+    temperature: Tuple[float, float] = (8.0, 0.5),
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[int, int, List[List[str]]]]:
+    """Search for the highest scoring board by simulated annealing.
+
+    Each step changes a tile or swaps two, keeping the change if it scores no worse
+    or otherwise with a chance that falls as the temperature cools from the first
+    to the second given. The step, score and rows of each best board are yielded as
+    it is found.
+    """
+    rng = random.Random(seed)
+    g = Grid(size)
+    for c in g:
+        g[c] = rng.choice(TILES)
+    board = Board(g)
+    tiles = board.tiles
+    sol = Solution(dct, board)
+    best = sol.score
+    yield 0, best, board.rows()
+
+    hot, cold = temperature
+    for k in range(1, steps + 1):
+        t = hot * (cold / hot) ** (k / steps)
+        old = sol.score
+        i = rng.randrange(len(tiles))
+        undo = [(i, tiles[i])]
+        if rng.random() < 0.5:
+            j = rng.randrange(len(tiles))
+            undo.append((j, tiles[j]))
+            sol[i], sol[j] = tiles[j], tiles[i]
+        else:
+            sol[i] = rng.choice(TILES)
+        if (d := sol.score - old) < 0 and rng.random() >= math.exp(d / t):
+            for i, tile in reversed(undo):
+                sol[i] = tile
+        elif sol.score > best:
+            best = sol.score
+            yield k, best, board.rows()
+
+
+# Queue an anneal worker process puts the boards it finds on.
+worker_found: Optional["Queue[Optional[Tuple[int, int, int, List[List[str]]]]]"] = None
+
+
+def init_anneal_worker(
+    dictionary: str, found: "Queue[Optional[Tuple[int, int, int, List[List[str]]]]]"
+) -> None:
+    global worker_found
+    init_worker(dictionary)
+    worker_found = found
+
+
+def anneal_worker(
+    restart: int, size: Tuple[int, int], steps: int, seed: Optional[int]
+) -> None:
+    assert worker_dct is not None and worker_found is not None
+    try:
+        for k, points, rows in anneal(worker_dct, size, steps, seed=seed):
+            worker_found.put((restart, k, points, rows))
+    finally:
+        # Tell the parent this restart is over, even if it failed.
+        worker_found.put(None)
+
+
+def optimize(
+    dictionary: str,
+    size: Tuple[int, int] = (4, 4),
+    steps: int = 10000,
+    restarts: int = 4,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[int, int, int, List[List[str]]]]:
+    """Anneal boards from several random starts in worker processes.
+
+    Yield the restart number, step, score and rows of each best board of a restart as
+    soon as the restart finds it.
+    """
+    seeds = random.Random(seed)
+    found: "Queue[Optional[Tuple[int, int, int, List[List[str]]]]]" = (
+        multiprocessing.Queue()
+    )
+    with ProcessPoolExecutor(
+        workers, initializer=init_anneal_worker, initargs=(dictionary, found)
+    ) as pool:
+        todo = [
+            pool.submit(anneal_worker, r, size, steps, seeds.getrandbits(32))
+            for r in range(restarts)
+        ]
+        running = restarts
+        while running:
+            try:
+                item = found.get(timeout=0.1)
+            except queue.Empty:
+                # A worker that failed to start or was killed never says it is over.
+                for f in todo:
+                    if f.done() and f.exception() is not None:
+                        f.result()
+                continue
+            if item is None:
+                running -= 1
+            else:
+                yield item
+        # Raise any error of a worker.
+        for f in todo:
+            f.result()
+
+
+PERCENTILES = (1, 10, 50, 90, 99)
+
+
+@dataclass
+class Stats:
+    """Distribution of the word counts and scores of many boards."""
+
+    boards: int
+    words: float
+    points: float
+    # Scores at each percentile.
+    percentiles: Dict[int, float]
+    # Share of boards with fewer words than the few given to simulate.
+    few: float
+    # Boards with scores from each bin edge up to the next.
+    histogram: List[Tuple[int, int]]
+
+
+def simulate(
+    dictionary: str,
+    dice: Sequence[Sequence[str]],
+    boards: int = 1000,
+    few: int = 10,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    bins: int = 10,
+) -> Stats:
+    """Rate boards rolled from a set of dice and summarize them.
+
+    Needs numpy. Ratings are collected into arrays so that summarizing millions of
+    boards costs little next to rating them.
+    """
+    import numpy as np
+
+    rng = random.Random(seed)
+    ratings = batch(dictionary, (roll(dice, rng) for _ in range(boards)), workers)
+    a = np.fromiter(
+        itertools.chain.from_iterable(ratings), dtype=np.int64, count=2 * boards
+    ).reshape(boards, 2)
+    words, points = a[:, 0], a[:, 1]
+    counts, edges = np.histogram(points, bins=bins)
+    return Stats(
+        boards=boards,
+        words=float(words.mean()),
+        points=float(points.mean()),
+        percentiles={
+            q: float(p) for q, p in zip(PERCENTILES, np.percentile(points, PERCENTILES))
+        },
+        few=float((words < few).mean()),
+        histogram=[(int(e), int(n)) for e, n in zip(edges, counts)],
+    )
+
+
+def rate_lines(
+    dictionary: Optional[str], lines: TextIO, workers: Optional[int]
+) -> None:
+    if dictionary is None:
+        raise Exception("no dictionary provided")
+
+    # Lines are kept until their ratings come back to print with them.
+    pending: Deque[str] = deque()
+
+    def boards() -> Iterator[Rows]:
+        for line in lines:
+            if line := line.strip():
+                pending.append(line)
+                yield [list(tokenize(row.lower())) for row in line.split()]
+
+    for words, points in batch(dictionary, boards(), workers):
+        print(pending.popleft(), words, points)
+
+
+@click.command()
+@click.option(
+    "--dictionary",
+    "-d",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
+)
+@click.option("--server", type=click.Path(), envvar="PYWORD_SERVER")
+@click.option(
+    "boards",
+    "--batch",
+    type=click.File(),
+    help="Rate the boards in this file, one per line as rows separated by spaces.",
+)
+@click.option("--workers", "-j", type=int, help="Worker processes for --batch.")
+@click.argument("rows", type=str, nargs=-1)
+def cli(
+    dictionary: Optional[str],
+    server: Optional[str],
+    boards: Optional[TextIO],
+    workers: Optional[int],
+    rows: List[str],
+) -> None:
+    if boards:
+        rate_lines(dictionary, boards, workers)
+        return
+    if not rows:
+        raise Exception("no grid provided")
+
+    chars = [list(tokenize(row.lower())) for row in rows]
+    g = Grid.from_rows(chars)
+
+    if server:
+        found = client.call(server, "boggle", chars)
+    else:
+        found = solve(load_dictionary(dictionary), g)
 
     def process(chars: Tuple[str, ...], path: Path) -> Tuple[str, Path, int]:
         word = "".join(chars)
         return word, path, score(word)
 
     result = sorted(
-        (process(word, path) for word, path in solve(dct, g)),
+        (process(word, path) for word, path in found),
         key=lambda item: item[2],
         reverse=True,
     )
@@ -155,5 +676,93 @@ def cli(dictionary: Optional[TextIO], rows: List[str]) -> None:
     print(f"({len(uniques)} words, {len(result)} paths, {max_points} points)")
 
 
+@click.command()
+@click.option(
+    "--dictionary",
+    "-d",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
+)
+@click.option("--size", type=(int, int), default=(4, 4), show_default=True)
+@click.option("--steps", type=int, default=10000, show_default=True)
+@click.option("--restarts", type=int, default=4, show_default=True)
+@click.option("--workers", "-j", type=int)
+@click.option("--seed", type=int)
+def optimize_cli(
+    dictionary: Optional[str],
+    size: Tuple[int, int],
+    steps: int,
+    restarts: int,
+    workers: Optional[int],
+    seed: Optional[int],
+) -> None:
+    if dictionary is None:
+        raise Exception("no dictionary provided")
+
+    start = time.monotonic()
+    best: Tuple[int, List[List[str]]] = (-1, [])
+    for r, k, points, rows in optimize(
+        dictionary, size, steps, restarts, workers, seed
+    ):
+        if points <= best[0]:
+            continue
+        best = points, rows
+        print(
+            f"{time.monotonic() - start:.1f}s restart {r}:",
+            " ".join("".join(row) for row in rows),
+            points,
+            f"(step {k})",
+            flush=True,
+        )
+
+    points, rows = best
+    print(f"(best {' '.join(''.join(row) for row in rows)}, {points} points)")
+
+
+@click.command()
+@click.option(
+    "--dictionary",
+    "-d",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
+)
+@click.option(
+    "--dice", type=click.Choice(list(DICE)), default="classic", show_default=True
+)
+@click.option("--boards", "-n", type=int, default=1000, show_default=True)
+@click.option(
+    "--few",
+    type=int,
+    default=10,
+    show_default=True,
+    help="Count boards with fewer words than this.",
+)
+@click.option("--workers", "-j", type=int)
+@click.option("--seed", type=int)
+def simulate_cli(
+    dictionary: Optional[str],
+    dice: str,
+    boards: int,
+    few: int,
+    workers: Optional[int],
+    seed: Optional[int],
+) -> None:
+    if dictionary is None:
+        raise Exception("no dictionary provided")
+
+    stats = simulate(dictionary, DICE[dice], boards, few, workers, seed)
+
+    for lo, n in stats.histogram:
+        print(f"{lo:>6} {n:>8} {'#' * round(50 * n / stats.boards)}")
+    print(
+        "percentiles",
+        " ".join(f"{q}%:{p:.0f}" for q, p in stats.percentiles.items()),
+    )
+    print(
+        f"({stats.boards} boards, {stats.words:.1f} words and {stats.points:.1f} points"
+        f" on average, {stats.few:.1%} with fewer than {few} words)"
+    )
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,78 @@
+import os
+import signal
+import socket
+import stat
+import sys
+from typing import BinaryIO, Optional
+
+import click
+
+from . import compact, server
+
+
+@click.group()
+def cli() -> None:
+    ...
+
+
+@cli.command("compile")
+@click.option("--lowercase", is_flag=True, help="Lowercase the words.")
+@click.argument("words", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output", type=click.File("wb"))
+def compile_(words: str, output: BinaryIO, lowercase: bool) -> None:
+    """Compile a file of words into a dictionary that loads instantly."""
+    print("loading dictionary...", end="", file=sys.stderr, flush=True)
+    dct = compact.load(words, compact.lowercase if lowercase else compact.strip)
+    print(f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True)
+    dct.table.dump(output)
+
+
+@cli.command()
+@click.option(
+    "--dictionary",
+    "-d",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
+)
+@click.argument("address", type=click.Path(), envvar="PYWORD_SERVER")
+def serve(dictionary: Optional[str], address: str) -> None:
+    """Serve solver requests on a Unix socket, keeping the dictionary loaded.
+
+    Point the solver commands at the server with their --server option or the
+    PYWORD_SERVER environment variable.
+    """
+    if dictionary is None:
+        raise Exception("no dictionary provided")
+
+    print("loading dictionary...", end="", file=sys.stderr, flush=True)
+    dct = compact.load(dictionary)
+    print(f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True)
+
+    if os.path.exists(address) and stale(address):
+        # Left by a server that was killed without the chance to remove it.
+        os.unlink(address)
+    # Exit on SIGTERM as on SIGINT so the socket is removed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    with server.Server(address, dct) as srv:
+        print(f"listening on {address}", file=sys.stderr, flush=True)
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(address)
+
+
+def stale(address: str) -> bool:
+    if not stat.S_ISSOCK(os.stat(address).st_mode):
+        return False
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(address)
+        except ConnectionRefusedError:
+            return True
+    return False
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,27 @@
+import json
+import socket
+from typing import Any, Iterator
+
+
+class ServerError(Exception):
+    ...
+
+
+def tuples(obj: Any) -> Any:
+    # JSON has no tuples so restore them from lists.
+    if isinstance(obj, list):
+        return tuple(map(tuples, obj))
+    return obj
+
+
+def call(address: str, solver: str, *args: Any) -> Iterator[Any]:
+    """Yield the results of a solver run by the server listening at address."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        sock.sendall(json.dumps({"solver": solver, "args": args}).encode() + b"\n")
+        with sock.makefile("r") as f:
+            for line in f:
+                msg = json.loads(line)
+                if "error" in msg:
+                    raise ServerError(msg["error"])
+                yield tuples(msg["result"])
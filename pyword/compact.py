@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import contextlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from . import trie
+
+H = TypeVar("H", bound=Hashable)
+T = TypeVar("T")
+
+# Compiled table file format: MAGIC, HEADER, then the alphabet (NUL separated UTF-8)
+# and the offsets, labels, targets, heights and ok arrays, each padded to 4 bytes. All
+# integers are little-endian.
+MAGIC = b"PYWORD\x00T"
+VERSION = 2
+HEADER = struct.Struct("<7I")
+
+
+class FormatError(Exception):
+    ...
+
+
+def pad(n: int) -> int:
+    return -n % 4
+
+
+class Table(Generic[H]):
+    """Frozen trie stored as flat arrays.
+
+    The edges of node i are offsets[i] to offsets[i + 1] in labels and targets. Labels
+    are indexes into alphabet and are sorted within each node so that they can be
+    bisected. Whether node i is the end of a key is bit i of ok. The length of the
+    longest key below node i is heights[i].
+    """
+
+    def __init__(
+        self,
+        alphabet: Sequence[H],
+        offsets: Sequence[int],
+        labels: Sequence[int],
+        targets: Sequence[int],
+        heights: Sequence[int],
+        ok: Sequence[int],
+        root: int,
+        count: int,
+    ) -> None:
+        self.alphabet = tuple(alphabet)
+        self.ids = {c: i for i, c in enumerate(self.alphabet)}
+        self.offsets = offsets
+        self.labels = labels
+        self.targets = targets
+        self.heights = heights
+        self.ok = ok
+        self.root = root
+        self.count = count
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def dump(self, f: BinaryIO) -> None:
+        if not all(isinstance(c, str) and "\x00" not in c for c in self.alphabet):
+            raise TypeError("only tables of str labels without NUL can be dumped")
+        alphabet = "\x00".join(self.alphabet).encode()  # type: ignore[arg-type]
+        f.write(MAGIC)
+        f.write(
+            HEADER.pack(
+                VERSION,
+                len(alphabet),
+                len(self),
+                len(self.labels),
+                len(self.ok),
+                self.root,
+                self.count,
+            )
+        )
+        f.write(alphabet + bytes(pad(len(alphabet))))
+        for a in (self.offsets, self.labels, self.targets, self.heights):
+            a = array("I", a)
+            if sys.byteorder != "little":
+                a.byteswap()
+            f.write(a.tobytes())
+        f.write(bytes(self.ok))
+
+    @classmethod
+    def load(cls, f: BinaryIO) -> Table[str]:
+        """Map a dumped table into memory.
+
+        The arrays are views of the file so loading takes the same time whatever the
+        size of the table and pages are only read from disk when they are traversed.
+        """
+        buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        i = 0
+
+        def take(n: int) -> memoryview:
+            nonlocal i
+            j = i + n
+            section = buf[i:j]
+            i = j + pad(n)
+            return section
+
+        if take(len(MAGIC)) != MAGIC:
+            raise FormatError("not a compiled dictionary")
+        version, alphabet_len, n, m, ok_len, root, count = HEADER.unpack(
+            take(HEADER.size)
+        )
+        if version != VERSION:
+            raise FormatError(f"unsupported version {version}: want {VERSION}")
+
+        alphabet = str(take(alphabet_len), "utf-8").split("\x00")
+        if not alphabet_len:
+            alphabet = []
+
+        arrays: List[Sequence[int]] = []
+        for size in (n + 1, m, m, n):
+            a: Sequence[int] = take(4 * size).cast("I")
+            if sys.byteorder != "little":
+                a = array("I", a)
+                a.byteswap()
+            arrays.append(a)
+        offsets, labels, targets, heights = arrays
+        ok = take(ok_len)
+
+        return Table(alphabet, offsets, labels, targets, heights, ok, root, count)
+
+
+class Edges(Mapping[H, "Node[H]"]):
+    __slots__ = ("table", "lo", "hi")
+
+    def __init__(self, table: Table[H], index: int) -> None:
+        self.table = table
+        self.lo = table.offsets[index]
+        self.hi = table.offsets[index + 1]
+
+    def get(  # type: ignore[override]
+        self, c: H, default: Node[H] | None = None
+    ) -> Node[H] | None:
+        table = self.table
+        i = table.ids.get(c)
+        if i is None:
+            return default
+        e = bisect_left(table.labels, i, self.lo, self.hi)
+        if e < self.hi and table.labels[e] == i:
+            return Node(table, table.targets[e])
+        return default
+
+    def __getitem__(self, c: H) -> Node[H]:
+        if (v := self.get(c)) is None:
+            raise KeyError(c)
+        return v
+
+    def __len__(self) -> int:
+        return self.hi - self.lo
+
+    def __iter__(self) -> Iterator[H]:
+        table = self.table
+        for e in range(self.lo, self.hi):
+            yield table.alphabet[table.labels[e]]
+
+    def items(self) -> Iterator[Tuple[H, Node[H]]]:  # type: ignore[override]
+        table = self.table
+        for e in range(self.lo, self.hi):
+            yield table.alphabet[table.labels[e]], Node(table, table.targets[e])
+
+
+class Node(trie.Node[H]):
+    """Read-only view of a node in a Table.
+
+    Can be used anywhere a trie.Node is traversed but not where one is modified.
+    """
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: Table[H], index: int | None = None) -> None:
+        self.table = table
+        self.index = table.root if index is None else index
+
+    @property
+    def ok(self) -> bool:  # type: ignore[override]
+        return bool(self.table.ok[self.index >> 3] >> (self.index & 7) & 1)
+
+    @property
+    def next(self) -> Edges[H]:  # type: ignore[override]
+        return Edges(self.table, self.index)
+
+    @property
+    def height(self) -> int:  # type: ignore[override]
+        return self.table.heights[self.index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.table is other.table and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.index))
+
+    def children(self, ordered: bool = False) -> Iterable[Tuple[H, Node[H]]]:
+        # Edges are always stored in order.
+        return self.next.items()
+
+    def indexes(self) -> Iterator[Tuple[List[H], int]]:
+        """Like walk but yield node indexes rather than views, in order."""
+        table = self.table
+        offsets, labels, targets = table.offsets, table.labels, table.targets
+        alphabet = table.alphabet
+        path: List[H] = []
+        todo = [[offsets[self.index], offsets[self.index + 1]]]
+        while todo:
+            edges = todo[-1]
+            e, end = edges
+            if e == end:
+                todo.pop()
+                if path:
+                    path.pop()
+                continue
+            edges[0] = e + 1
+            v = targets[e]
+            path.append(alphabet[labels[e]])
+            yield path, v
+            if offsets[v] < offsets[v + 1]:
+                todo.append([offsets[v], offsets[v + 1]])
+            else:
+                path.pop()
+
+    def walk(self, ordered: bool = False) -> Iterator[Tuple[List[H], Node[H]]]:
+        for w, v in self.indexes():
+            yield w, Node(self.table, v)
+
+    def keys(self, ordered: bool = False) -> Iterator[Sequence[H]]:
+        ok = self.table.ok
+        for w, v in self.indexes():
+            if ok[v >> 3] >> (v & 7) & 1:
+                yield tuple(w)
+
+    def words(self: Node[str], ordered: bool = False) -> Iterator[str]:
+        ok = self.table.ok
+        for w, v in self.indexes():
+            if ok[v >> 3] >> (v & 7) & 1:
+                yield "".join(w)
+
+    def add(self, key: Iterable[H]) -> None:
+        raise TypeError("compact trie is read-only")
+
+    def remove(self, key: Iterable[H]) -> None:
+        raise TypeError("compact trie is read-only")
+
+    def __len__(self) -> int:
+        if self.index == self.table.root:
+            return self.table.count
+        return sum(1 for _ in self.keys())
+
+    def size(self) -> int:
+        if self.index == self.table.root:
+            return len(self.table) - 1
+        return sum(1 for _ in self.nodes())
+
+    @classmethod
+    def from_keys(
+        cls: Type[Node[H]], keys: Iterable[Sequence[H]], minimize: bool = True
+    ) -> Node[H]:
+        b: Builder[H] = Builder(minimize)
+        for key in sorted(set(keys)):  # type: ignore[type-var]
+            b.add(key)
+        return Node(b.build())
+
+
+class Builder(Generic[H]):
+    """Build a Table from keys added in sorted order.
+
+    Nodes are written out as soon as no later key can extend them, so the build never
+    holds more than the path of the last key in memory as Python objects.
+
+    If minimize then a node is only written if no node with the same ok and edges has
+    been written before, otherwise the existing node is shared. Because nodes are only
+    written once complete this merges all equivalent suffixes and the result is a
+    minimal DAWG (Daciuk et al. 2000) rather than a tree.
+    """
+
+    def __init__(self, minimize: bool = False) -> None:
+        self.ids: Dict[H, int] = {}
+        self.offsets = array("I")
+        self.labels = array("I")
+        self.targets = array("I")
+        self.heights = array("I")
+        self.ok = bytearray()
+        self.count = 0
+        self.prev: Sequence[H] | None = None
+        # Open nodes on the path of prev as (ok, edges).
+        self.path: List[Tuple[bool, List[Tuple[int, int]]]] = [(False, [])]
+        self.register: Dict[Tuple[bool, Tuple[Tuple[int, int], ...]], int] | None = (
+            {} if minimize else None
+        )
+
+    def add(self, key: Sequence[H]) -> None:
+        prev = self.prev
+        if prev is not None:
+            if key == prev:
+                return
+            if key < prev:  # type: ignore[operator]
+                raise ValueError(f"key {key!r} added after {prev!r}")
+        self.prev = key
+
+        # Write out nodes not on the path shared with the previous key.
+        i = 0
+        if prev is not None:
+            n = min(len(key), len(prev))
+            while i < n and key[i] == prev[i]:
+                i += 1
+            self.close(i)
+
+        for c in key[i:]:
+            self.path[-1][1].append((self.id(c), -1))
+            self.path.append((False, []))
+        self.path[-1] = (True, self.path[-1][1])
+        if key:
+            self.count += 1
+
+    def id(self, c: H) -> int:
+        if (i := self.ids.get(c)) is None:
+            i = self.ids[c] = len(self.ids)
+        return i
+
+    def close(self, depth: int) -> None:
+        while len(self.path) > depth + 1:
+            v = self.write(*self.path.pop())
+            edges = self.path[-1][1]
+            edges[-1] = (edges[-1][0], v)
+
+    def write(self, ok: bool, edges: List[Tuple[int, int]]) -> int:
+        if self.register is not None:
+            key = ok, tuple(edges)
+            if (v := self.register.get(key)) is None:
+                v = self.register[key] = self.append(ok, edges)
+            return v
+        return self.append(ok, edges)
+
+    def append(self, ok: bool, edges: List[Tuple[int, int]]) -> int:
+        v = len(self.offsets)
+        self.offsets.append(len(self.targets))
+        height = 0
+        for c, u in edges:
+            self.labels.append(c)
+            self.targets.append(u)
+            height = max(height, self.heights[u] + 1)
+        self.heights.append(height)
+        if v & 7 == 0:
+            self.ok.append(0)
+        if ok:
+            self.ok[v >> 3] |= 1 << (v & 7)
+        return v
+
+    def build(self) -> Table[H]:
+        self.close(0)
+        root = self.write(*self.path.pop())
+        self.register = None
+        self.offsets.append(len(self.targets))
+
+        # Labels were numbered in order of appearance; renumber in sorted order so
+        # that each node's labels, written in key order, are sorted too.
+        alphabet = sorted(self.ids)  # type: ignore[type-var]
+        renumber = [0] * len(alphabet)
+        for i, c in enumerate(alphabet):
+            renumber[self.ids[c]] = i
+        labels = array("I", (renumber[c] for c in self.labels))
+
+        return Table(
+            alphabet,
+            self.offsets,
+            labels,
+            self.targets,
+            self.heights,
+            self.ok,
+            root,
+            self.count,
+        )
+
+
+def strip(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        yield line.strip()
+
+
+def lowercase(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        yield line.strip().lower()
+
+
+def load(
+    path: str, keys: Callable[[Iterable[str]], Iterable[Sequence[str]]] = strip
+) -> Node[str]:
+    """Load a dictionary from either a compiled table or a file of words.
+
+    The lines of a file of words are converted to keys by keys.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            f.seek(0)
+            return Node(Table.load(f))
+    with open(path) as f:
+        return Node.from_keys(keys(f))
+
+
+def cached(
+    dictionary: str,
+    suffix: str,
+    load: Callable[[str], Optional[T]],
+    store: Callable[[str], object],
+) -> Optional[T]:
+    """Load what is stored alongside a dictionary at its path plus suffix.
+
+    If nothing is stored, it is older than the dictionary or load gives None, store
+    writes it afresh. It is written to a temporary file first and moved into place
+    once whole. None is returned if it cannot be stored, which only costs building
+    it again next time.
+    """
+    path = dictionary + suffix
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(dictionary):
+        if (got := load(path)) is not None:
+            return got
+    tmp = path + ".tmp"
+    try:
+        store(tmp)
+        os.replace(tmp, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        return None
+    return load(path)
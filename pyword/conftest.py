@@ -0,0 +1,22 @@
+from pathlib import Path
+from typing import Callable, Iterable, Tuple
+
+from pytest import fixture
+
+from . import compact
+
+Compile = Callable[[Iterable[str]], Tuple[str, compact.Node[str]]]
+
+
+@fixture
+def compiled(tmp_path: Path) -> Compile:
+    """Compile keys to a dictionary file, giving its path and the dictionary."""
+
+    def compile(keys: Iterable[str]) -> Tuple[str, compact.Node[str]]:
+        dct = compact.Node.from_keys(keys)
+        dictionary = tmp_path / "words.pyw"
+        with dictionary.open("wb") as f:
+            dct.table.dump(f)
+        return str(dictionary), dct
+
+    return compile
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import itertools
+import json
+import os
 import sys
-from itertools import chain
-from queue import PriorityQueue
+from bisect import bisect_left
+from heapq import heappop, heappush
 from typing import (
     Dict,
     FrozenSet,
@@ -10,17 +13,16 @@ from typing import (
     Iterator,
     List,
     Optional,
+    Sequence,
     Set,
-    TextIO,
     Tuple,
 )
 
 import click
+from click.core import ParameterSource
 
-from . import trie
+from . import client, compact, trie
 
-# TODO: Possible culprit for high memory use by storing duplicates rather than using a
-#  handle. Need a FrozenSet that hashes by id().
 Edge = FrozenSet[str]
 
 
@@ -34,125 +36,507 @@ class Word(Tuple[Tuple[Edge, str], ...]):
 
 class EdgeSet(FrozenSet[Edge]):
     def words(self, dct: trie.Node[str]) -> Iterator[Word]:
-        todo: List[Tuple[trie.Node[str], Word]] = []
-        for char, v in dct.next.items():
-            for next in self:
-                if char in next:
-                    todo.append((v, Word(((next, char),))))
+        """Yield the words of dct that can be spelt on these edges.
+
+        The search keeps the edges as indexes and the word so far in one list, changed
+        in place, so a Word is only made of those yielded. Words share the same edge
+        and char pairs.
+        """
+        # The edges of each char, by index, and their edge and char pairs.
+        on: Dict[str, List[int]] = {}
+        pairs: Dict[Tuple[int, str], Tuple[Edge, str]] = {}
+        for i, edge in enumerate(self):
+            for char in edge:
+                on.setdefault(char, []).append(i)
+                pairs[i, char] = edge, char
+
+        path: List[Tuple[Edge, str]] = []
+        todo: List[Tuple[int, int, str, trie.Node[str]]] = [
+            (0, i, char, v) for char, v in dct.next.items() for i in on.get(char, ())
+        ]
         while todo:
-            u, path = todo.pop()
+            depth, i, char, u = todo.pop()
+            del path[depth:]
+            path.append(pairs[i, char])
             if u.ok:
-                yield path
+                yield Word(path)
+            depth += 1
             for char, v in u.next.items():
-                prev = path[-1][0]
-                for next in self:
+                for j in on.get(char, ()):
                     # Do not use same edge twice in a row.
-                    if next is prev:
-                        continue
-                    if char in next:
-                        todo.append((v, Word((*path, (next, char)))))
+                    if j != i:
+                        todo.append((depth, j, char, v))
 
 
 def count(it: Iterator) -> int:
     return sum(1 for _ in it)
 
 
-def find_adj(words: Set[Word]) -> Dict[Word, Set[Word]]:
-    return {
-        prev: {next for next in words if prev[-1][1] == next[0][1]} for prev in words
+def edge_bits(edges: EdgeSet) -> Tuple[Dict[Tuple[Edge, str], int], int]:
+    """Number each char of each edge with a bit.
+
+    The mask of them all, which a solution uses, is given too.
+    """
+    bits = {
+        (edge, char): 1 << i
+        for i, (edge, char) in enumerate(
+            (edge, char) for edge in edges for char in edge
+        )
     }
+    return bits, (1 << len(bits)) - 1
 
 
-def solve(
-    dct: trie.Node[str], edges: EdgeSet, max_words: int, max_solutions: int
-) -> Iterator[Tuple[Word, ...]]:
-    if max_words == 0:
-        return
+def coverage(word: Word, bits: Dict[Tuple[Edge, str], int]) -> int:
+    m = 0
+    for edge_char in word:
+        m |= bits[edge_char]
+    return m
 
-    if max_solutions == 0:
-        return
 
-    # Find words that are possible according to the game rules and arrange by adjacent
-    # i.e. which next words can follow prev word.
-    adj = find_adj(set(edges.words(dct)))
+# Words of the same first and last chars by the mask of the edge chars they use.
+Bucket = Dict[int, List[Word]]
 
-    # Remove 1 char words as these can not advance the solution.
-    adj = {
-        prev: {next for next in nexts if len(next) > 1}
-        for prev, nexts in adj.items()
-        if len(prev) > 1
-    }
 
-    # Prune BFS to not search paths longer than the best outcome so far.
-    best: Tuple[Word, ...] = ()
-    todo: PriorityQueue[Tuple[int, Tuple[Word, ...]]] = PriorityQueue()
-    for word in adj:
-        todo.put_nowait((1, (word,)))
+def buckets(
+    words: Iterable[Word], bits: Dict[Tuple[Edge, str], int]
+) -> Dict[Tuple[str, str], Bucket]:
+    """Group words by their first and last chars and the edge chars they use.
+
+    Words using only edge chars that another word of their bucket uses too are left
+    out as the other word can take their place in any solution.
+    """
+    groups: Dict[Tuple[str, str], Bucket] = {}
+    for word in words:
+        ends = word[0][1], word[-1][1]
+        groups.setdefault(ends, {}).setdefault(coverage(word, bits), []).append(word)
+    for bucket in groups.values():
+        # Masks of more chars first so each is checked against those that may cover it.
+        kept: List[int] = []
+        for m in sorted(bucket, key=lambda m: bin(m).count("1"), reverse=True):
+            if any(m | k == k for k in kept):
+                del bucket[m]
+            else:
+                kept.append(m)
+    return groups
+
+
+# Last char of the last word and mask of the edge chars used so far.
+State = Tuple[str, int]
+
+# The words leading to each state of a layer from the states of the layer before it.
+Layer = Dict[State, List[Tuple[Optional[State], List[Word]]]]
+
+
+def unwind(layers: List[Layer], state: State) -> Iterator[Tuple[Word, ...]]:
+    """Yield every path of words through layers to state in the last of them."""
+    for prev, words in layers[-1][state]:
+        if prev is None:
+            for word in words:
+                yield (word,)
+            continue
+        for path in unwind(layers[:-1], prev):
+            for word in words:
+                yield (*path, word)
+
+
+def solve(
+    dct: trie.Node[str], edges: EdgeSet, max_words: int, max_solutions: int
+) -> Iterator[Tuple[Word, ...]]:
+    """Yield the solutions of fewest words.
+
+    Paths of words are searched a word at a time by the state they lead to rather than
+    one by one. A state reached by fewer words before is not expanded again as it can
+    not lead to a solution of fewest words, but every path to a state first reached by
+    this many words is kept to yield every solution, bar those of words another word
+    of the same ends and more edge chars can replace.
+    """
+    bits, done = edge_bits(edges)
+
+    # Find words that are possible according to the game rules and arrange them by
+    # first char, as the words that can follow a word are those starting with its last.
+    # Remove 1 char words as these can not advance the solution.
+    after: Dict[str, List[Tuple[str, int, List[Word]]]] = {}
+    words = (word for word in edges.words(dct) if len(word) > 1)
+    for (first, last), bucket in buckets(words, bits).items():
+        after.setdefault(first, []).extend((last, m, ws) for m, ws in bucket.items())
+
+    layer: Layer = {}
+    for nexts in after.values():
+        for last, m, ws in nexts:
+            layer.setdefault((last, m), []).append((None, ws))
+    layers = [layer]
+    seen = set(layer)
 
     # Sometimes the word list might contain some words not recognised by the game.
     # Allow emitting additional solutions of same length as a workaround without having
     # to do an exhaustive search.
     num_solutions = 0
 
-    while not todo.empty():
-        _depth, words = todo.get_nowait()
+    while layer:
+        solved = [state for state in layer if state[1] == done]
+        if solved:
+            for state in solved:
+                for path in unwind(layers, state):
+                    yield path
+                    num_solutions += 1
+                    if num_solutions >= max_solutions > 0:
+                        return
+            return
+
+        if 0 < max_words <= len(layers):
+            return
+
+        next_layer: Layer = {}
+        for state in layer:
+            char, used = state
+            for last, m, ws in after.get(char, ()):
+                next_state = (last, used | m)
+                if next_state not in seen:
+                    next_layer.setdefault(next_state, []).append((state, ws))
+        seen.update(next_layer)
+        layers.append(next_layer)
+        layer = next_layer
+
+
+def shortest(
+    words: Iterable[Word], bits: Dict[Tuple[Edge, str], int]
+) -> Dict[str, List[Tuple[str, int, int, List[Word]]]]:
+    """Group words by their first char, last char, edge chars used and length.
+
+    Words using only edge chars that another word of the same ends uses too, with no
+    more letters, are left out.
+    """
+    groups: Dict[Tuple[str, str], Dict[Tuple[int, int], List[Word]]] = {}
+    for word in words:
+        ends = word[0][1], word[-1][1]
+        key = coverage(word, bits), len(word)
+        groups.setdefault(ends, {}).setdefault(key, []).append(word)
+    after: Dict[str, List[Tuple[str, int, int, List[Word]]]] = {}
+    for (first, last), group in groups.items():
+        kept: List[Tuple[int, int]] = []
+        for m, n in sorted(group, key=lambda mn: (-bin(mn[0]).count("1"), mn[1])):
+            if not any(m | k == k and length <= n for k, length in kept):
+                kept.append((m, n))
+                after.setdefault(first, []).append((last, m, n, group[m, n]))
+    return after
+
+
+def fewest_letters(
+    dct: trie.Node[str],
+    edges: EdgeSet,
+    max_words: int,
+    max_solutions: int,
+    words_first: bool = False,
+) -> Iterator[Tuple[Word, ...]]:
+    """Yield solutions by fewest letters, or fewest words then fewest letters.
+
+    Paths of words are searched best first by the letters used so far plus at least
+    those needed for the edge chars not used yet, so solutions come out best first. A
+    path is not expanded if max_solutions paths ending in the same char that used the
+    same edge chars and more for no more cost, or with max_words no more words and no
+    more letters, were. With solutions unlimited, one such path that is better in any
+    way is enough, and solutions are never left out.
+    """
+    bits, done = edge_bits(edges)
+    after = shortest((word for word in edges.words(dct) if len(word) > 1), bits)
+
+    # No word uses more new edge chars than the most any word uses. If every char is
+    # on one edge a word also has a letter more than it uses as its first is not new.
+    most = max(
+        (bin(m).count("1") for nexts in after.values() for _, m, _, _ in nexts),
+        default=1,
+    )
+    shared = int(sum(map(len, edges)) == len(set().union(*edges)))
+
+    todo: List[
+        Tuple[Tuple[int, int], Tuple[int, int], int, int, int, State, List[List[Word]]]
+    ] = []
+    order = itertools.count()
+
+    def push(words: int, letters: int, state: State, path: List[List[Word]]) -> None:
+        left = bin(done & ~state[1]).count("1")
+        # At least this many more words, each of at least 2 letters, are needed.
+        more = -(-left // most)
+        if 0 < max_words < words + more:
+            return
+        least = letters + max(left + shared * more, 2 * more)
+        if words_first:
+            f, g = (words + more, least), (words, letters)
+        else:
+            f, g = (least, words + more), (letters, words)
+        heappush(todo, (f, g, next(order), words, letters, state, path))
+
+    for nexts in after.values():
+        for last, m, n, ws in nexts:
+            push(1, n, (last, m), [ws])
+
+    # The edge chars used, words, letters and cost of the paths expanded, by their last
+    # char.
+    closed: Dict[str, List[Tuple[int, int, int, Tuple[int, int]]]] = {}
+    num_solutions = 0
 
-        if best and len(words) > len(best):
+    while todo:
+        _, g, _, words, letters, state, path = heappop(todo)
+        char, used = state
+        expanded = closed.setdefault(char, [])
+        better = 0
+        # With solutions unlimited every solution is yielded, only paths to expand are
+        # pruned.
+        for m, w, n, c in expanded if max_solutions > 0 or used != done else ():
+            # With words limited a path of fewer letters but more words may have none
+            # left for the words this one needs.
+            if used | m == m and (
+                w <= words and n <= letters if max_words > 0 else c <= g
+            ):
+                # Paths just as good lead to other solutions of the same cost.
+                if max_solutions <= 0 and (m, w, n) == (used, words, letters):
+                    continue
+                better += 1
+                if better >= max_solutions:
+                    break
+        else:
+            expanded.append((used, words, letters, g))
+        if better >= max(max_solutions, 1):
             continue
 
-        chars = Word(chain.from_iterable(words))
-
-        # TODO: Looking for fewest chars is still hard.
-        # if best and len(chars) >= sum(1 for _ in chain.from_iterable(best)):
-        #     continue
+        if used == done:
+            for solution in itertools.product(*path):
+                yield solution
+                num_solutions += 1
+                if num_solutions >= max_solutions > 0:
+                    return
+            continue
 
-        if chars.edges() == edges:
-            yield words
-            best = words
-            num_solutions += 1
-            if num_solutions >= max_solutions > 0:
-                return
+        for last, m, n, ws in after.get(char, ()):
+            push(words + 1, letters + n, (last, used | m), [*path, ws])
+
+
+def exhaust(
+    dct: trie.Node[str], edges: EdgeSet, max_words: int, resume: Sequence[int] = ()
+) -> Iterator[Tuple[Tuple[int, ...], Tuple[Word, ...]]]:
+    """Yield every solution of up to max_words words and its position in the search.
+
+    The search is depth first, one word at a time, so takes memory only for as many
+    words as a solution may have. Words are searched in a fixed order so the position
+    of a solution, the indexes of its words in that order, can be given back as resume
+    to carry on after it. Of solutions of the same strings, with chars on more than
+    one edge, only the first is yielded.
+    """
+    if max_words <= 0:
+        raise ValueError("exhaustive search needs a positive max_words")
+
+    bits, done = edge_bits(edges)
+    words = sorted(
+        (word for word in edges.words(dct) if len(word) > 1),
+        key=lambda word: [(char, sorted(edge)) for edge, char in word],
+    )
+    masks = [coverage(word, bits) for word in words]
+    most = max((bin(m).count("1") for m in masks), default=0)
+    starting: Dict[str, List[int]] = {}
+    for i, word in enumerate(words):
+        starting.setdefault(word[0][1], []).append(i)
+    # Words of the same chars on different edges, when a char is on more than one.
+    spelt: Dict[str, List[int]] = {}
+    for i, word in enumerate(words):
+        spelt.setdefault("".join(c for _, c in word), []).append(i)
+    alike = [spelt["".join(c for _, c in word)] for word in words]
+
+    def first(path: Sequence[int]) -> bool:
+        # Whether no solution of the same strings comes before path.
+        for other in itertools.product(*(alike[i] for i in path)):
+            if list(other) == path:
+                return True
+            m = 0
+            for i in other:
+                # Solutions end at the first word covering every edge.
+                if m == done:
+                    break
+                m |= masks[i]
+            else:
+                if m == done:
+                    return False
+        return True
+
+    path: List[int] = []
+
+    def search(
+        nexts: Sequence[int], used: int, resume: Sequence[int]
+    ) -> Iterator[Tuple[int, ...]]:
+        start = bisect_left(nexts, resume[0]) if resume else 0
+        for k in range(start, len(nexts)):
+            i = nexts[k]
+            # Only the first word can be where the search was.
+            resumed = k == start and bool(resume) and i == resume[0]
+            m = used | masks[i]
+            path.append(i)
+            if m == done:
+                # Yielded before if resuming after it.
+                if not resumed and first(path):
+                    yield tuple(path)
+            elif (max_words - len(path)) * most >= bin(done & ~m).count("1"):
+                yield from search(
+                    starting.get(words[i][-1][1], ()),
+                    m,
+                    resume[1:] if resumed else (),
+                )
+            path.pop()
+
+    for position in search(range(len(words)), 0, resume):
+        yield position, tuple(words[i] for i in position)
+
+
+def unique(found: Iterable[Tuple[Word, ...]]) -> Iterator[Tuple[str, ...]]:
+    """Yield the words of each solution as strings, leaving out repeats.
+
+    Solutions are told apart by hash, which may leave out one whose hash is the same
+    as another's, to keep memory down when there are many.
+    """
+    seen: Set[int] = set()
+    for words in found:
+        path = tuple("".join(char[1] for char in word) for word in words)
+        if (h := hash(path)) not in seen:
+            yield path
+            seen.add(h)
 
-        if 0 < max_words <= len(words):
-            continue
 
-        prev = words[-1]
-        for next in adj[prev]:
-            todo.put_nowait((len(words) + 1, (*words, next)))
+# Solution orders: fewest words, fewest letters or fewest words then letters.
+FEWEST = ("words", "letters", "both")
 
 
 def solves(
-    dct: trie.Node[str], edges: EdgeSet, max_words: int, max_solutions: int
+    dct: trie.Node[str],
+    edges: EdgeSet,
+    max_words: int,
+    max_solutions: int,
+    fewest: str = "words",
 ) -> Iterator[Tuple[str, ...]]:
-    seen: Set[Tuple[str, ...]] = set()
-    for words in solve(dct, edges, max_words, max_solutions):
-        path = tuple("".join(char[1] for char in word) for word in words)
-        if path not in seen:
-            yield path
-            seen.add(path)
+    """Yield the words of the solutions in the order asked for.
+
+    None are asked for with a max_words or max_solutions of 0, and either is unlimited
+    below 0.
+    """
+    if max_words == 0 or max_solutions == 0:
+        return iter(())
+    found: Iterable[Tuple[Word, ...]] = (
+        solve(dct, edges, max_words, max_solutions)
+        if fewest == "words"
+        else fewest_letters(
+            dct, edges, max_words, max_solutions, words_first=fewest == "both"
+        )
+    )
+    return unique(found)
 
 
 @click.command()
 @click.option(
-    "--dictionary", "-d", "dct_file", type=click.File("r"), envvar="PYWORD_DICTIONARY"
+    "--dictionary",
+    "-d",
+    "dct_file",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
 )
+@click.option("--server", type=click.Path(), envvar="PYWORD_SERVER")
 @click.option("--max-solutions", "-o", type=int, default=1)
+@click.option(
+    "--fewest",
+    type=click.Choice(FEWEST),
+    default="words",
+    show_default=True,
+    help="Find solutions of fewest words, letters, or words then letters (both).",
+)
+@click.option(
+    "--exhaustive",
+    is_flag=True,
+    help="Find every solution of up to max words words, printing each when found.",
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    help="Carry on an exhaustive search from this file, recording where it is in it.",
+)
 @click.argument("max_words", type=int)
 @click.argument("edges", type=str, nargs=-1)
 def cli(
-    dct_file: Optional[TextIO], edges: Iterable[str], max_words: int, max_solutions: int
+    dct_file: Optional[str],
+    server: Optional[str],
+    edges: Iterable[str],
+    max_words: int,
+    max_solutions: int,
+    fewest: str,
+    exhaustive: bool,
+    checkpoint: Optional[str],
 ) -> None:
-    if not dct_file:
-        raise Exception("no dictionary provided")
+    found: Iterable[Tuple[str, ...]]
+    if exhaustive:
+        ctx = click.get_current_context()
+        if server:
+            raise click.UsageError("--exhaustive searches locally, not with --server")
+        if ctx.get_parameter_source("max_solutions") != ParameterSource.DEFAULT:
+            raise click.UsageError("--exhaustive finds every solution, not -o of them")
+        if fewest != "words":
+            raise click.UsageError("--exhaustive finds solutions in no --fewest order")
+        if not dct_file:
+            raise Exception("no dictionary provided")
+
+        exhaustive_cli(dct_file, edges, max_words, checkpoint)
+        return
+    if checkpoint:
+        raise click.UsageError("--checkpoint is only for --exhaustive")
+
+    if server:
+        found = client.call(
+            server, "letter-boxed", list(edges), max_words, max_solutions, fewest
+        )
+    else:
+        if not dct_file:
+            raise Exception("no dictionary provided")
+
+        print("loading dictionary...", end="", file=sys.stderr, flush=True)
+        dct = compact.load(dct_file)
+        print(
+            f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True
+        )
+        found = solves(
+            dct,
+            EdgeSet(frozenset(edge) for edge in edges),
+            max_words,
+            max_solutions,
+            fewest,
+        )
+
+    for words in found:
+        print(words, flush=True)
+
+
+def exhaustive_cli(
+    dct_file: str, edges: Iterable[str], max_words: int, checkpoint: Optional[str]
+) -> None:
+    # The position of a solution is only meaningful for the same search.
+    search = {
+        "dictionary": os.path.abspath(dct_file),
+        "mtime": os.path.getmtime(dct_file),
+        "edges": sorted("".join(sorted(edge)) for edge in edges),
+        "max_words": max_words,
+    }
+    resume: List[int] = []
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            saved = json.load(f)
+        if saved["search"] != search:
+            raise click.UsageError(
+                f"checkpoint {checkpoint} is of another search: {saved['search']}"
+            )
+        resume = saved["position"]
 
     print("loading dictionary...", end="", file=sys.stderr, flush=True)
-    dct = trie.Node.from_keys(map(str.strip, dct_file))
+    dct = compact.load(dct_file)
     print(f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True)
-
-    for words in solves(
-        dct,
-        EdgeSet(frozenset(edge) for edge in edges),
-        max_words,
-        max_solutions,
+    for position, solution in exhaust(
+        dct, EdgeSet(frozenset(edge) for edge in edges), max_words, resume
     ):
-        print(words, flush=True)
+        print(tuple("".join(c for _, c in word) for word in solution), flush=True)
+        if checkpoint:
+            # Replace the checkpoint whole so it is never left half written.
+            with open(checkpoint + ".tmp", "w") as f:
+                json.dump({"search": search, "position": position}, f)
+            os.replace(checkpoint + ".tmp", checkpoint)
@@ -1,12 +1,29 @@
 import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
 from itertools import product
-from typing import Iterator, List, Mapping, Sequence, Set, TextIO, Tuple
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 import click
 from typing_extensions import TypeAlias
 
-from . import trie
+from . import client, compact, trie
 
 YX: TypeAlias = Tuple[int, int]
 
@@ -54,9 +71,46 @@ class Grid(Mapping[YX, str]):
         ymax, xmax = self.size
         return 0 <= y < ymax and 0 <= x < xmax
 
+    def line(self, yx: YX, dyx: YX) -> str:
+        """Return the chars from yx to the edge of the grid in direction dyx."""
+        rows = self._rows
+        ymax, xmax = self.size
+        y, x = yx
+        dy, dx = dyx
+        chars = []
+        while 0 <= y < ymax and 0 <= x < xmax:
+            chars.append(rows[y][x])
+            y += dy
+            x += dx
+        return "".join(chars)
+
+    def starts(self, dyx: YX) -> Iterator[YX]:
+        """Yield the cells where lines in direction dyx enter the grid."""
+        ymax, xmax = self.size
+        dy, dx = dyx
+        # Lines enter on the edges they move away from.
+        y0 = 0 if dy > 0 else ymax - 1
+        x0 = 0 if dx > 0 else xmax - 1
+        if dy:
+            for x in range(xmax):
+                yield y0, x
+        if dx:
+            for y in range(ymax):
+                if not dy or y != y0:
+                    yield y, x0
+
+    def lines(self) -> Iterator[Tuple[YX, YX, str]]:
+        """Yield the start, direction and chars of every line across the grid."""
+        for dyx in sorted(ORIENTATIONS):
+            for yx in self.starts(dyx):
+                yield yx, dyx, self.line(yx, dyx)
+
 
 Word: TypeAlias = Tuple[YX, ...]
 
+# Start, direction and length of a word in a grid.
+Match: TypeAlias = Tuple[YX, YX, int]
+
 
 ORIENTATIONS: Set[YX] = {
     (0, 1),
@@ -69,39 +123,373 @@ ORIENTATIONS: Set[YX] = {
     (1, 1),
 }
 
+# Direction that words of one char are found in.
+ONE: YX = (0, 1)
 
-def solve(dct: trie.Node, grid: Grid) -> Iterator[Word]:
-    todo: List[Tuple[trie.Node, YX, Word]] = []
-    for yx0, char0 in grid.items():
-        if (v := dct.next.get(char0)) is not None:
-            todo.append((v, (0, 0), (yx0,)))
-    while todo:
-        u, dyx, path = todo.pop()
+
+class Scanner:
+    """Walker of a trie along lines from every offset.
+
+    Most walks end within a couple of chars so the nodes of the prefixes of two chars
+    are kept rather than looked up every time.
+    """
+
+    def __init__(self, dct: trie.Node) -> None:
+        self.dct = dct
+        self.first = dict(dct.next.items())
+        self.second: Dict[str, Optional[trie.Node]] = {}
+
+    def prefixes(self, line: str, i: int = 0) -> Iterator[int]:
+        """Yield the length of every key that line has at i."""
+        if (u := self.first.get(line[i])) is None:
+            return
+        if u.ok:
+            yield 1
+        j = i + 2
+        if j > len(line):
+            return
+        if (key := line[i:j]) in self.second:
+            v = self.second[key]
+        else:
+            v = self.second[key] = u.next.get(line[i + 1])
+        if v is None:
+            return
+        u = v
         if u.ok:
-            yield path
-        yx0 = path[-1]
-        for dyx in ORIENTATIONS if len(path) == 1 else {dyx}:  # noqa: B020
-            yx1 = yx_add(yx0, dyx)
-            if char1 := grid.get(yx1):
-                if (v := u.next.get(char1)) is not None:
-                    todo.append((v, dyx, (*path, yx1)))
+            yield 2
+        for k in range(j, len(line)):
+            if (v := u.next.get(line[k])) is None:
+                return
+            u = v
+            if u.ok:
+                yield k - i + 1
+
+    def matches(self, line: str) -> Iterator[Tuple[int, int]]:
+        """Yield the start and length of every key in line."""
+        for i in range(len(line)):
+            for n in self.prefixes(line, i):
+                yield i, n
+
+
+class Automaton:
+    """Aho-Corasick automaton of the keys of a trie.
+
+    States are the nodes of the trie numbered breadth first, so the children of each
+    state are numbered together and their labels can be kept in one list indexed by
+    state. Each state links to the state of the longest proper suffix of its key
+    that is a prefix of any key, to move to when no edge matches, and to the state
+    of the longest such suffix that is a key, to find every key ending at a char.
+    """
+
+    def __init__(self, dct: trie.Node) -> None:
+        # Children of state s are states offsets[s] to offsets[s + 1].
+        self.offsets = array("i")
+        self.labels = [""]
+        self.depths = array("i", [0])
+        self.ok = bytearray(1)
+        nodes = [dct]
+        for s, u in enumerate(nodes):
+            self.offsets.append(len(nodes))
+            for c, v in u.children(ordered=True):
+                nodes.append(v)
+                self.labels.append(c)
+                self.depths.append(self.depths[s] + 1)
+                self.ok.append(v.ok)
+        self.offsets.append(len(nodes))
+        del nodes
+
+        self.fail = array("i", bytes(4 * len(self.labels)))
+        self.out = array("i", bytes(4 * len(self.labels)))
+        for s in range(len(self.labels)):
+            start, end = self.offsets[s], self.offsets[s + 1]
+            for t in range(start, end):
+                f = self.next(self.fail[s], self.labels[t]) if s else 0
+                self.fail[t] = f
+                self.out[t] = f if self.ok[f] else self.out[f]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def goto(self, s: int, c: str) -> int:
+        lo, hi = self.offsets[s], self.offsets[s + 1]
+        if (i := bisect_left(self.labels, c, lo, hi)) < hi and self.labels[i] == c:
+            return i
+        return 0
+
+    def next(self, s: int, c: str) -> int:
+        # Fall back along failure links until there is an edge, or none at the root.
+        while not (t := self.goto(s, c)) and s:
+            s = self.fail[s]
+        return t
+
+    def matches(self, line: str) -> Iterator[Tuple[int, int]]:
+        """Yield the start and length of every key in line."""
+        offsets, labels, depths = self.offsets, self.labels, self.depths
+        fail, out, ok = self.fail, self.out, self.ok
+        s = 0
+        for i, c in enumerate(line):
+            # As next, inlined as this is the inner loop.
+            while True:
+                lo, hi = offsets[s], offsets[s + 1]
+                if (t := bisect_left(labels, c, lo, hi)) < hi and labels[t] == c:
+                    s = t
+                    break
+                if not s:
+                    break
+                s = fail[s]
+            t = s if ok[s] else out[s]
+            while t:
+                yield i - depths[t] + 1, depths[t]
+                t = out[t]
+
+    @classmethod
+    def from_trie(cls, dct: trie.Node) -> "Automaton":
+        return cls(dct)
+
+
+def search(matcher: Union[Scanner, Automaton], grid: Grid) -> Iterator[Match]:
+    """Yield the start, direction and length of each word in the grid.
+
+    Each line across the grid is pulled out once and given to the matcher. Words of
+    one char are only found in one direction.
+    """
+    for (y, x), (dy, dx), line in grid.lines():
+        one = (dy, dx) == ONE
+        for i, n in matcher.matches(line):
+            if n > 1 or one:
+                yield (y + i * dy, x + i * dx), (dy, dx), n
+
+
+def scan(dct: trie.Node, grid: Grid) -> Iterator[Match]:
+    """Yield the start, direction and length of each word in the grid.
+
+    The trie is walked along each line from every offset. For large grids searching
+    with an Automaton reads each line only once.
+    """
+    return search(Scanner(dct), grid)
+
+
+def stream(dct: trie.Node, rows: Iterable[str]) -> Iterator[Tuple[str, Match]]:
+    """Yield each word in a grid and its match as the grid's rows are read.
+
+    Only as many rows are kept as the longest word is long, enough for any word going
+    up from the row just read or down from the oldest row kept. Words going down are
+    yielded once the rows they go through have been read.
+    """
+    scanner = Scanner(dct)
+    height = max(dct.height, 1)
+    window: Deque[str] = deque(maxlen=height)
+    # Row of the grid at the top of the window.
+    top = 0
+    width = 0
+
+    def words(yx: YX, dyx: YX, line: str, i: int = 0) -> Iterator[Tuple[str, Match]]:
+        for n in scanner.prefixes(line, i):
+            if n > 1 or dyx == ONE:
+                end = i + n
+                yield line[i:end], (yx, dyx, n)
+
+    def vertical(y: int, dy: int) -> Iterator[Tuple[str, Match]]:
+        # Words going up or down from row y through the window.
+        for x in range(width):
+            for dx in (-1, 0, 1):
+                chars = []
+                j, xj = y - top, x
+                while 0 <= j < len(window) and 0 <= xj < width:
+                    chars.append(window[j][xj])
+                    j += dy
+                    xj += dx
+                yield from words((y, x), (dy, dx), "".join(chars))
+
+    y = -1
+    for y, row in enumerate(rows):
+        if not y:
+            width = len(row)
+        elif len(row) != width:
+            raise ValueError(f"row {y} is {len(row)} chars: want {width}")
+        if len(window) == height:
+            top += 1
+        window.append(row)
+        reverse = row[::-1]
+        for x in range(width):
+            yield from words((y, x), (0, 1), row, x)
+            yield from words((y, x), (0, -1), reverse, width - 1 - x)
+        yield from vertical(y, -1)
+        if len(window) == height:
+            yield from vertical(top, 1)
+    # Words going down from the rows left, the top one done already if it had them.
+    for y0 in range(top + (len(window) == height), y + 1):
+        yield from vertical(y0, 1)
+
+
+# Corners of a part of a grid, top left inclusive and bottom right exclusive.
+Box: TypeAlias = Tuple[int, int, int, int]
+
+
+def tiles(grid: Grid, size: int, margin: int) -> Iterator[Tuple[List[str], YX, Box]]:
+    """Split a grid into square tiles.
+
+    Yield the rows of each tile with margin more cells on every side, where they fit,
+    the cell at the top left of those rows and the box of the tile itself.
+    """
+    ymax, xmax = grid.size
+    for y0 in range(0, ymax, size):
+        for x0 in range(0, xmax, size):
+            y1, x1 = min(y0 + size, ymax), min(x0 + size, xmax)
+            top, left = max(y0 - margin, 0), max(x0 - margin, 0)
+            bottom, right = min(y1 + margin, ymax), min(x1 + margin, xmax)
+            rows = [row[left:right] for row in grid._rows[top:bottom]]
+            yield rows, (top, left), (y0, x0, y1, x1)
+
+
+def inside(start: int, step: int, lo: int, hi: int) -> range:
+    """Return the range of i for which start + i * step is in [lo, hi)."""
+    if step > 0:
+        return range(lo - start, hi - start)
+    if step < 0:
+        return range(start - hi + 1, start - lo + 1)
+    return range(0, sys.maxsize if lo <= start < hi else 0)
+
+
+def scan_tile(
+    scanner: Scanner, rows: Sequence[str], origin: YX, box: Box
+) -> Iterator[Match]:
+    """Yield the matches of words starting in box, going no further than rows.
+
+    Each line across the rows is taken once and searched from the offsets in box.
+    """
+    oy, ox = origin
+    y0, x0, y1, x1 = box
+    for (y, x), (dy, dx), line in Grid(*rows).lines():
+        y, x = y + oy, x + ox
+        ys, xs = inside(y, dy, y0, y1), inside(x, dx, x0, x1)
+        for i in range(max(ys.start, xs.start, 0), min(ys.stop, xs.stop, len(line))):
+            for n in scanner.prefixes(line, i):
+                if n > 1 or (dy, dx) == ONE:
+                    yield (y + i * dy, x + i * dx), (dy, dx), n
+
+
+# Scanner of a tile worker process.
+worker_scanner: Optional[Scanner] = None
+
+
+def init_worker(dictionary: str) -> None:
+    global worker_scanner
+    worker_scanner = Scanner(compact.load(dictionary))
+
+
+def scan_tile_worker(rows: List[str], origin: YX, box: Box) -> List[Match]:
+    assert worker_scanner is not None
+    return list(scan_tile(worker_scanner, rows, origin, box))
+
+
+def scan_parallel(
+    dictionary: str,
+    grid: Grid,
+    height: int,
+    size: int = 128,
+    workers: Optional[int] = None,
+) -> Iterator[Match]:
+    """Yield the matches of every word in the grid, searching tiles of it in parallel.
+
+    Tiles overlap by as many cells as words of height chars go past their first so
+    each finds every word starting in it, and only those so no word is found twice.
+    The matches are the same as scan's, tile by tile. Each worker loads the
+    dictionary itself so give a compiled one.
+    """
+    with ProcessPoolExecutor(
+        workers, initializer=init_worker, initargs=(dictionary,)
+    ) as pool:
+        parts = list(tiles(grid, size, max(height - 1, 0)))
+        for found in pool.map(scan_tile_worker, *zip(*parts)):
+            yield from found
+
+
+def cells(match: Match) -> Word:
+    (y, x), (dy, dx), n = match
+    return tuple((y + i * dy, x + i * dx) for i in range(n))
+
+
+def solve(dct: trie.Node, grid: Grid) -> Iterator[Word]:
+    for match in scan(dct, grid):
+        yield cells(match)
 
 
 @click.command()
 @click.option(
-    "--dictionary", "-d", "dct_file", type=click.File("r"), envvar="PYWORD_DICTIONARY"
+    "--dictionary",
+    "-d",
+    "dct_file",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
+)
+@click.option("--server", type=click.Path(), envvar="PYWORD_SERVER")
+@click.option(
+    "--automaton",
+    is_flag=True,
+    help="Search with an Aho-Corasick automaton, which is quicker for large grids.",
+)
+@click.option(
+    "grid_file",
+    "--grid",
+    type=click.File(),
+    help="Read the grid from this file, one row per line, searching it as it is read.",
+)
+@click.option(
+    "--workers",
+    "-j",
+    type=int,
+    help="Search tiles of the grid in this many processes.",
 )
 @click.argument("rows", type=str, nargs=-1)
-def cli(dct_file: TextIO | None, rows: Sequence[str]) -> None:
+def cli(
+    dct_file: str | None,
+    server: str | None,
+    automaton: bool,
+    grid_file: TextIO | None,
+    workers: int | None,
+    rows: Sequence[str],
+) -> None:
+    if grid_file:
+        if dct_file is None:
+            raise Exception("no dictionary provided")
+
+        print("loading dictionary...", end="", file=sys.stderr, flush=True)
+        dct = compact.load(dct_file)
+        print(
+            f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True
+        )
+        lines = (line for s in grid_file if (line := s.strip()))
+        for chars, match in stream(dct, lines):
+            print(chars, cells(match))
+        return
+
     grid = Grid(*rows)
 
-    if dct_file is None:
-        raise Exception("no dictionary provided")
+    paths: Iterable[Word]
+    if server:
+        paths = client.call(server, "linear", rows)
+    else:
+        if dct_file is None:
+            raise Exception("no dictionary provided")
 
-    print("loading dictionary...", end="", file=sys.stderr, flush=True)
-    dct = trie.Node.from_keys(map(str.strip, dct_file))
-    print(f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True)
+        print("loading dictionary...", end="", file=sys.stderr, flush=True)
+        dct = compact.load(dct_file)
+        print(
+            f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True
+        )
+        if automaton:
+            print("building automaton...", end="", file=sys.stderr, flush=True)
+            a = Automaton.from_trie(dct)
+            print(f" ok ({len(a)} states)", file=sys.stderr, flush=True)
+            paths = map(cells, search(a, grid))
+        elif workers:
+            paths = map(
+                cells, scan_parallel(dct_file, grid, dct.height, workers=workers)
+            )
+        else:
+            paths = solve(dct, grid)
 
-    for path in solve(dct, grid):
+    for path in paths:
         chars = "".join(grid[yx] for yx in path)
         print(chars, path)
@@ -0,0 +1,82 @@
+import json
+import socketserver
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from . import boggle, letter_boxed, linear, spelling_bee, trie, wordiply
+
+Solver = Callable[..., Iterable[Any]]
+
+
+def solve_boggle(dct: trie.Node[str], rows: Sequence[Sequence[str]]) -> Iterable[Any]:
+    return boggle.solve(dct, boggle.Grid.from_rows(rows))
+
+
+def solve_linear(dct: trie.Node[str], rows: Sequence[str]) -> Iterable[Any]:
+    return linear.solve(dct, linear.Grid(*rows))
+
+
+def solve_letter_boxed(
+    dct: trie.Node[str],
+    edges: List[str],
+    max_words: int,
+    max_solutions: int,
+    fewest: str = "words",
+) -> Iterable[Any]:
+    return letter_boxed.solves(
+        dct,
+        letter_boxed.EdgeSet(frozenset(edge) for edge in edges),
+        max_words,
+        max_solutions,
+        fewest,
+    )
+
+
+def solve_spelling_bee(
+    dct: trie.Node[str], optional: str, required: str = ""
+) -> Iterable[Any]:
+    return spelling_bee.solve(spelling_bee.index(dct), optional, required)
+
+
+def solve_wordiply(dct: trie.Node[str], contains: str) -> Iterable[Any]:
+    return wordiply.solve(wordiply.index(dct), contains)
+
+
+SOLVERS: Dict[str, Solver] = {
+    "boggle": solve_boggle,
+    "letter-boxed": solve_letter_boxed,
+    "linear": solve_linear,
+    "spelling-bee": solve_spelling_bee,
+    "wordiply": solve_wordiply,
+}
+
+
+class Handler(socketserver.StreamRequestHandler):
+    server: "Server"
+
+    def handle(self) -> None:
+        try:
+            req = json.loads(self.rfile.readline())
+            solver = SOLVERS[req["solver"]]
+            for result in solver(self.server.dct, *req["args"]):
+                self.send({"result": result})
+        except Exception as e:
+            self.send({"error": f"{type(e).__name__}: {e}"})
+
+    def send(self, msg: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(msg).encode() + b"\n")
+        self.wfile.flush()
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    """Serve solver requests on a Unix socket using one resident dictionary.
+
+    Each connection is a request of one JSON line {"solver": name, "args": [...]}
+    answered by a JSON line {"result": ...} per result the solver yields, or one
+    {"error": ...} line if it fails. Connections are handled in their own threads.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: str, dct: trie.Node[str]) -> None:
+        self.dct = dct
+        super().__init__(address, Handler)
@@ -1,78 +1,241 @@
+from __future__ import annotations
+
+import struct
 import sys
-from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+from array import array
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import click
 
-from . import trie
+from . import client, compact, trie
+
+
+def bit(c: str) -> int:
+    # Letters a-z fit in the low 26 bits, anything else goes above them.
+    i = ord(c) - ord("a")
+    return 1 << (i if 0 <= i < 26 else 26 + ord(c))
+
+
+def mask(chars: Iterable[str]) -> int:
+    m = 0
+    for c in chars:
+        m |= bit(c)
+    return m
+
+
+def points(w: str, pangram: bool) -> int:
+    # Must be 4 chars or more.
+    if len(w) < 4:
+        return 0
+    if len(w) == 4:
+        # 4 chars is worth 1 point.
+        p = 1
+    else:
+        # Otherwise 1 point per char.
+        p = len(w)
+    # Bonus points if all optional chars used.
+    if pangram:
+        p += 7
+    return p
+
+
+# Index file format: MAGIC, HEADER, then the masks and the offsets of their words as
+# little-endian arrays and the words, newline separated UTF-8.
+MAGIC = b"PYWORD\x00B"
+VERSION = 1
+HEADER = struct.Struct("<3I")
+
+# Puzzle letters are a-z so words of any other chars are left out of the index.
+LETTERS = (1 << 26) - 1
+
+
+def unmask(m: int) -> str:
+    return "".join(chr(ord("a") + i) for i in range(26) if m >> i & 1)
+
+
+class Index:
+    """Words by the mask of the letters they use.
+
+    The words of a puzzle are those whose mask is within the puzzle's letters and
+    includes the required ones, so are found by looking up each such mask.
+    """
+
+    def __init__(self, words: Dict[int, List[str]]) -> None:
+        self.words = words
+
+    def __len__(self) -> int:
+        return sum(len(ws) for ws in self.words.values())
+
+    def solve(
+        self, optional: Iterable[str], required: Iterable[str] = ""
+    ) -> Iterator[Tuple[str, int]]:
+        need = mask(required)
+        allowed = mask(optional) | need
+        free = allowed & ~need
+        # Count down through the submasks of the free letters.
+        sub = free
+        while True:
+            m = sub | need
+            for w in self.words.get(m, ()):
+                yield w, points(w, m == allowed)
+            if not sub:
+                break
+            sub = (sub - 1) & free
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> Index:
+        groups: Dict[int, List[str]] = {}
+        for w in words:
+            if w and (m := mask(w)) & LETTERS == m:
+                groups.setdefault(m, []).append(w)
+        return cls(groups)
+
+    @classmethod
+    def from_trie(cls, dct: trie.Node[str]) -> Index:
+        return cls.from_words(dct.words())
+
+    def dump(self, f: BinaryIO) -> None:
+        masks = array("I", sorted(self.words))
+        offsets = array("I", [0])
+        words: List[str] = []
+        for m in masks:
+            words.extend(self.words[m])
+            offsets.append(len(words))
+        text = "\n".join(words).encode()
+        if sys.byteorder != "little":
+            masks.byteswap()
+            offsets.byteswap()
+        f.write(MAGIC)
+        f.write(HEADER.pack(VERSION, len(masks), len(text)))
+        f.write(masks.tobytes())
+        f.write(offsets.tobytes())
+        f.write(text)
+
+    @classmethod
+    def load(cls, f: BinaryIO) -> Index:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise compact.FormatError("not a spelling bee index")
+        version, n, text_len = HEADER.unpack(f.read(HEADER.size))
+        if version != VERSION:
+            raise compact.FormatError(f"unsupported version {version}: want {VERSION}")
+        masks, offsets = array("I"), array("I")
+        masks.frombytes(f.read(4 * n))
+        offsets.frombytes(f.read(4 * (n + 1)))
+        if sys.byteorder != "little":
+            masks.byteswap()
+            offsets.byteswap()
+        words = f.read(text_len).decode().split("\n")
+        groups = {}
+        for i, m in enumerate(masks):
+            start, end = offsets[i], offsets[i + 1]
+            groups[m] = words[start:end]
+        return cls(groups)
+
+
+def load_index(dictionary: str) -> Index:
+    """Load the index stored alongside a dictionary.
+
+    The index is built and stored first if there is none or it is older than the
+    dictionary.
+    """
+
+    def load(path: str) -> Index:
+        with open(path, "rb") as f:
+            return Index.load(f)
+
+    def store(path: str) -> None:
+        with open(path, "wb") as f:
+            Index.from_trie(compact.load(dictionary)).dump(f)
+
+    ix = compact.cached(dictionary, ".bee", load, store)
+    return ix or Index.from_trie(compact.load(dictionary))
+
+
+# Keep the index of the last dictionary the server was asked about.
+index = lru_cache(maxsize=1)(Index.from_trie)
+
+
+def puzzles(ix: Index, size: int = 7) -> Iterator[Tuple[str, str, int]]:
+    """Yield the letters, required letter and total score of every puzzle.
+
+    A puzzle is any size letters that make a pangram with any one of them required.
+    """
+    totals = {m: sum(points(w, False) for w in ws) for m, ws in ix.words.items()}
+    for pangram, ws in ix.words.items():
+        chars = unmask(pangram)
+        if len(chars) != size:
+            continue
+        for c in chars:
+            # Count up the words of the submasks with c in them.
+            need = bit(c)
+            free = pangram & ~need
+            score = 7 * len(ws)
+            sub = free
+            while True:
+                score += totals.get(sub | need, 0)
+                if not sub:
+                    break
+                sub = (sub - 1) & free
+            yield chars, c, score
 
 
 def solve(
-    dct: trie.Node[str], optional: Iterable[str], required: Iterable[str] = ""
+    dct: trie.Node[str] | Index,
+    optional: Iterable[str],
+    required: Iterable[str] = "",
 ) -> Iterator[Tuple[str, int]]:
-    if not isinstance(optional, set):
-        optional = set(optional)
-    if not isinstance(required, set):
-        required = set(required)
-    optional.update(required)
-
-    def score(w: str) -> int:
-        # Must be 4 chars or more.
-        if len(w) < 4:
-            return 0
-        # Must only contain optional chars.
-        c = set(w)
-        assert isinstance(optional, set)
-        if c - optional:
-            return 0
-        # Must contain all required chars.
-        assert isinstance(required, set)
-        if required - c:
-            return 0
-        if len(w) == 4:
-            # 4 chars is worth 1 point.
-            p = 1
-        else:
-            # Otherwise 1 point per char.
-            p = len(w)
-        # Bonus points if all optional chars used.
-        if not optional - c:
-            p += 7
-        return p
+    """Yield the words of a puzzle and their scores."""
+    if isinstance(dct, Index):
+        yield from dct.solve(optional, required)
+        return
+
+    chars = {c: bit(c) for c in (*optional, *required)}
+    need = mask(required)
+    allowed = mask(chars)
 
     # Seed search with words starting with any char from list.
-    s: List[Tuple[str, trie.Node[str]]] = [
-        (c, u) for c in optional if (u := dct.next.get(c))
+    s: List[Tuple[str, int, trie.Node[str]]] = [
+        (c, b, u) for c, b in chars.items() if (u := dct.next.get(c))
     ]
     while s:
-        w, u = s.pop()
+        w, m, u = s.pop()
         # Solution if is a word and all required chars used.
-        if u.ok and not required - set(w):
-            yield w, score(w)
+        if u.ok and m & need == need:
+            yield w, points(w, m == allowed)
         # Extend search with any next char from list.
-        for c in optional:
+        for c, b in chars.items():
             if (v := u.next.get(c)) is not None:
-                s.append((w + c, v))
-
-
-def iter_strip(it: Iterable[str]) -> Iterator[str]:
-    for s in it:
-        yield s.strip()
+                s.append((w + c, m | b, v))
 
 
 @click.command()
-@click.option("--dictionary", "-d", type=click.File("r"), envvar="PYWORD_DICTIONARY")
+@click.option(
+    "--dictionary",
+    "-d",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
+)
+@click.option("--server", type=click.Path(), envvar="PYWORD_SERVER")
 @click.argument("optional", type=str)
 @click.argument("required", type=str, default="")
-def cli(dictionary: Optional[TextIO], optional: str, required: str) -> None:
-    if dictionary is None:
-        raise Exception("no dictionary provided")
+def cli(
+    dictionary: Optional[str], server: Optional[str], optional: str, required: str
+) -> None:
+    found: Iterable[Tuple[str, int]]
+    if server:
+        found = client.call(server, "spelling-bee", optional, required)
+    else:
+        if dictionary is None:
+            raise Exception("no dictionary provided")
 
-    print("loading dictionary...", end="", file=sys.stderr, flush=True)
-    dct = trie.Node.from_keys(iter_strip(dictionary))
-    print(f" ok ({len(dct)} words, {dct.size()} nodes)", file=sys.stderr, flush=True)
+        print("loading index...", end="", file=sys.stderr, flush=True)
+        ix = load_index(dictionary)
+        print(f" ok ({len(ix)} words)", file=sys.stderr, flush=True)
+        found = solve(ix, optional, required)
 
     result = sorted(
-        solve(dct, optional, required),
+        found,
         key=lambda item: item[1],
         reverse=True,
     )
@@ -83,5 +246,29 @@ def cli(dictionary: Optional[TextIO], optional: str, required: str) -> None:
     print(f"({len(result)} words, {sum(score for _, score in result)} points)")
 
 
+@click.command()
+@click.option(
+    "--dictionary",
+    "-d",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
+)
+@click.option("--size", type=int, default=7, show_default=True)
+def puzzles_cli(dictionary: Optional[str], size: int) -> None:
+    if dictionary is None:
+        raise Exception("no dictionary provided")
+
+    print("loading index...", end="", file=sys.stderr, flush=True)
+    ix = load_index(dictionary)
+    print(f" ok ({len(ix)} words)", file=sys.stderr, flush=True)
+
+    result = sorted(puzzles(ix, size), key=lambda item: item[2], reverse=True)
+
+    for chars, required, score in result:
+        print(chars, required, score)
+
+    print(f"({len(result)} puzzles)")
+
+
 if __name__ == "__main__":
     cli()
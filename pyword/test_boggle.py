@@ -1,8 +1,25 @@
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path as FilePath
 from typing import Callable, Dict, Iterable, Sequence, Set, Tuple
 
-from pytest import mark, param
+from pytest import importorskip, mark, param, raises
 
-from .boggle import Grid, Path, solve
+from .boggle import (
+    DICE,
+    Board,
+    Grid,
+    Path,
+    Solution,
+    anneal,
+    batch,
+    optimize,
+    rate,
+    roll,
+    simulate,
+    solve,
+)
+from .compact import MAGIC
+from .conftest import Compile
 from .trie import Node
 
 KeyCharFunc = Callable[[Tuple[int, int]], str]
@@ -124,6 +141,15 @@ class TestGrid:
         assert dict(g.adj(to)) == want
 
 
+def test_board() -> None:
+    g = init_grid(size=(3, 2))
+    b = Board(g)
+    assert b.cells == list(g)
+    assert b.tiles == [key_to_char(k) for k in g]
+    for i, c in enumerate(b.cells):
+        assert {b.cells[j] for j in b.adj[i]} == dict(g.adj(c)).keys()
+
+
 @mark.parametrize(
     ["dct", "g", "want"],
     [
@@ -151,9 +177,108 @@ class TestGrid:
             },
             id="repeat",
         ),
+        param(
+            ["quit", "quiet", "suit"],
+            init_grid(
+                size=(2, 2),
+                chars=unpack_sequences(
+                    [
+                        ["qu", "i"],
+                        ["s", "t"],
+                    ]
+                ),
+            ),
+            {
+                (("qu", "i", "t"), ((0, 0), (1, 0), (1, 1))),
+            },
+            id="multi_char_tile",
+        ),
     ],
 )
 def test_solve(
     dct: Iterable[str], g: Grid, want: Set[Tuple[Tuple[str], Path, int]]
 ) -> None:
     assert set(solve(Node.from_keys(dct), g)) == want
+
+
+def test_batch(compiled: Compile) -> None:
+    dictionary, dct = compiled(["dog", "dig", "dug", "god", "quit"])
+    boards = [["dog", "iug", "tqi"], ["qit", "dig", "uoa"], ["zzz", "zzz", "zzz"]] * 5
+
+    got = list(batch(dictionary, boards, workers=2, chunksize=2))
+
+    assert got == [rate(dct, Grid.from_rows(rows)) for rows in boards]
+    assert got[2] == (0, 0)
+
+
+WORDS = ["dog", "dig", "dug", "god", "gig", "quit", "quite", "toe", "tide"]
+
+
+def test_solution() -> None:
+    dct = Node.from_keys(WORDS)
+    board = Board(Grid.from_rows(["dog", "iug", "tqi"]))
+    sol = Solution(dct, board)
+    for i, tile in [(7, "qu"), (0, "t"), (4, "i"), (8, "e"), (0, "d"), (7, "x")]:
+        sol[i] = tile
+        g = Grid.from_rows(board.rows())
+        assert set(sol.paths()) == {tuple(p) for p in Board(g).search(dct)}
+        assert sol.score == rate(dct, g)[1]
+
+
+def test_anneal() -> None:
+    dct = Node.from_keys(WORDS)
+    found = list(anneal(dct, size=(3, 3), steps=200, seed=0))
+    scores = [points for _, points, _ in found]
+    assert scores == sorted(set(scores))
+    _, points, rows = found[-1]
+    assert points == rate(dct, Grid.from_rows(rows))[1]
+
+
+def test_optimize(compiled: Compile) -> None:
+    dictionary, dct = compiled(WORDS)
+
+    found = list(optimize(dictionary, (3, 3), steps=50, restarts=2, seed=0))
+
+    assert {r for r, _, _, _ in found} == {0, 1}
+    for _, _, points, rows in found:
+        assert points == rate(dct, Grid.from_rows(rows))[1]
+
+
+def test_optimize_broken(compiled: Compile) -> None:
+    dictionary = FilePath(compiled(WORDS)[0])
+    data = bytearray(dictionary.read_bytes())
+    data[len(MAGIC)] += 1
+    dictionary.write_bytes(data)
+
+    # Workers that cannot load the dictionary fail the search rather than hang it.
+    with raises(BrokenProcessPool):
+        list(optimize(str(dictionary), (3, 3), steps=50, restarts=2, seed=0))
+
+
+def test_solution_watch() -> None:
+    dct = Node.from_keys(WORDS)
+    g = Grid.from_rows(["dog", "iug", "tqi"])
+    sol = Solution.watch(dct, g)
+    for k, c in [((1, 2), "qu"), ((0, 0), "t"), ((2, 2), "e"), ((0, 0), "d")]:
+        g[k] = c
+        assert set(sol.solve()) == set(solve(dct, g))
+
+
+@mark.parametrize("dice", DICE)
+def test_roll(dice: str) -> None:
+    rows = roll(DICE[dice])
+    tiles = [tile for row in rows for tile in row]
+    assert len(rows) ** 2 == len(tiles) == len(DICE[dice])
+    assert all(len(row) == len(rows) for row in rows)
+    Grid.from_rows(rows)
+
+
+def test_simulate(compiled: Compile) -> None:
+    importorskip("numpy")
+    dictionary, _ = compiled(WORDS)
+
+    stats = simulate(dictionary, DICE["classic"], boards=20, workers=1, seed=0)
+
+    assert stats.boards == sum(n for _, n in stats.histogram) == 20
+    assert stats.few == 1.0
+    assert stats.percentiles[1] <= stats.percentiles[50] <= stats.percentiles[99]
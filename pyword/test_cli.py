@@ -0,0 +1,37 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+from . import client
+
+
+def serve(dictionary: str, address: str) -> "subprocess.Popen[str]":
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "pyword.cli", "serve", "-d", dictionary, address],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert proc.stderr is not None
+    while "listening" not in proc.stderr.readline():
+        assert proc.poll() is None
+    return proc
+
+
+def test_serve_terminate(tmp_path: Path) -> None:
+    dictionary = tmp_path / "words"
+    dictionary.write_text("dog\ngod\n")
+    address = str(tmp_path / "pyword.sock")
+    # A socket left behind by a server that was killed.
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(address)
+
+    for _ in range(2):
+        proc = serve(str(dictionary), address)
+        assert set(client.call(address, "wordiply", "o")) == {"dog", "god"}
+        proc.send_signal(signal.SIGTERM)
+        proc.communicate(timeout=10)
+
+        assert not os.path.exists(address)
@@ -0,0 +1,164 @@
+from pathlib import Path
+from typing import Optional
+
+from pytest import mark, param, raises
+
+from . import boggle, compact, trie
+from .conftest import Compile
+
+KEYS = ("dog", "dig", "do", "doge", "cat", "a")
+
+
+class TestNode:
+    def test_keys(self) -> None:
+        want = trie.Node.from_keys(KEYS)
+        got = compact.Node.from_keys(KEYS, minimize=False)
+
+        assert set(got.keys()) == set(want.keys())
+        assert len(got) == len(want)
+        assert got.size() == want.size()
+
+    def test_minimize(self) -> None:
+        keys = ("walk", "walked", "walking", "talk", "talked", "talking")
+        want = trie.Node.from_keys(keys)
+        got = compact.Node.from_keys(keys)
+
+        assert set(got.keys()) == set(want.keys())
+        assert len(got) == len(want)
+        # w and t lead to the same "alk" and "ed" and "ing" end in the same leaf.
+        assert got.size() == len("alk") + len("ed") + len("in") + 1
+
+    @mark.parametrize(
+        ["key", "ok"],
+        [
+            param("do", True, id="prefix_ok"),
+            param("d", False, id="prefix"),
+            param("doge", True, id="leaf"),
+            param("dot", None, id="missing"),
+            param("z", None, id="unknown_label"),
+        ],
+    )
+    def test_node(self, key: str, ok: Optional[bool]) -> None:
+        u = compact.Node.from_keys(KEYS).node(key)
+        if ok is None:
+            assert u is None
+        else:
+            assert u is not None
+            assert u.ok is ok
+
+    def test_next(self) -> None:
+        u = compact.Node.from_keys(KEYS).node("do")
+        assert u is not None
+        assert list(u.next) == ["g"]
+        assert u.next.get("g") == u.node("g")
+        assert u.next.get("x") is None
+
+    def test_read_only(self) -> None:
+        dct = compact.Node.from_keys(KEYS)
+        with raises(TypeError):
+            dct.add("dot")
+        with raises(TypeError):
+            dct.remove("dog")
+
+    def test_solve(self) -> None:
+        g = boggle.Grid((2, 2))
+        for k, c in zip(g, "dgoi"):
+            g[k] = c
+        want = set(boggle.solve(trie.Node.from_keys(KEYS), g))
+        got = set(boggle.solve(compact.Node.from_keys(KEYS), g))
+
+        assert got == want
+
+
+class TestBuilder:
+    def test_unsorted(self) -> None:
+        b: compact.Builder[str] = compact.Builder()
+        b.add("dog")
+        with raises(ValueError):
+            b.add("cat")
+
+    def test_duplicate(self) -> None:
+        b: compact.Builder[str] = compact.Builder()
+        for key in ("cat", "cat", "dog"):
+            b.add(key)
+        assert compact.Node(b.build()).size() == 6
+
+
+def test_load(tmp_path: Path, compiled: Compile) -> None:
+    words = tmp_path / "words"
+    words.write_text("".join(f"{key}\n" for key in KEYS))
+
+    want = compact.load(str(words))
+    got = compact.load(compiled(KEYS)[0])
+
+    assert set(got.keys()) == set(want.keys())
+    assert len(got) == len(want)
+    assert got.size() == want.size()
+    assert got.node("doge") is not None
+
+
+def test_load_version(compiled: Compile) -> None:
+    dictionary = Path(compiled(KEYS)[0])
+    data = bytearray(dictionary.read_bytes())
+    data[len(compact.MAGIC)] += 1
+    dictionary.write_bytes(data)
+
+    with raises(compact.FormatError):
+        compact.load(str(dictionary))
+
+
+def test_counts() -> None:
+    u = compact.Node.from_keys(KEYS, minimize=False).node("d")
+    want = trie.Node.from_keys(KEYS).node("d")
+    assert u is not None and want is not None
+    assert len(u) == len(want)
+    assert u.size() == want.size()
+
+
+def test_words() -> None:
+    got = compact.Node.from_keys(KEYS).words(ordered=True)
+    assert list(got) == sorted(KEYS)
+
+
+def test_load_case(tmp_path: Path) -> None:
+    words = tmp_path / "words"
+    words.write_text("Dog\ngod\n")
+    compiled = tmp_path / "words.bin"
+    with compiled.open("wb") as f:
+        compact.load(str(words)).table.dump(f)
+    lowered = tmp_path / "lowered.bin"
+    with lowered.open("wb") as f:
+        compact.load(str(words), compact.lowercase).table.dump(f)
+
+    # Both formats of a list give the same keys, and boggle lowercases its own.
+    for path in (words, compiled):
+        assert set(compact.load(str(path)).words()) == {"Dog", "god"}
+    assert set(compact.load(str(lowered)).words()) == {"dog", "god"}
+    assert set(boggle.load_dictionary(str(words)).keys()) == {
+        tuple("dog"),
+        tuple("god"),
+    }
+
+
+def test_cached(tmp_path: Path) -> None:
+    words = tmp_path / "words"
+    words.write_text("dog\n")
+    stored = []
+
+    def store(path: str) -> None:
+        stored.append(path)
+        with open(path, "w") as f:
+            f.write("dog")
+
+    def fail(path: str) -> None:
+        open(path, "w").close()
+        raise OSError("full")
+
+    got = compact.cached(str(words), ".x", lambda path: open(path).read(), store)
+    again = compact.cached(str(words), ".x", lambda path: open(path).read(), fail)
+    # A half written file is never left where it is loaded from.
+    failed = compact.cached(str(words), ".y", lambda path: open(path).read(), fail)
+
+    assert got == again == "dog" and stored == [f"{words}.x.tmp"]
+    assert failed is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["words", "words.x"]
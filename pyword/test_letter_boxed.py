@@ -1,3 +1,7 @@
+import pathlib
+
+from click.testing import CliRunner
+
 from . import letter_boxed as lb
 from . import trie
 
@@ -67,3 +71,126 @@ def test_solves() -> None:
     want = {("hit", "to", "one"), ("hit", "ton", "none")}
 
     assert got == want
+
+
+def test_solve_fewest() -> None:
+    dct = trie.Node.from_keys(("hit", "ton", "none", "to", "one", "hitone", "eh"))
+    edges = lb.EdgeSet((frozenset(("h", "t", "n")), frozenset(("i", "o", "e"))))
+
+    got = list(lb.solves(dct, edges, 5, -1))
+
+    # Longer solutions such as ("hit", "to", "one") are not yielded.
+    assert got == [("hitone",)]
+    assert len(list(lb.solves(dct, edges, 5, 1))) == 1
+
+
+def test_buckets() -> None:
+    a = frozenset(("h", "t", "n"))
+    b = frozenset(("i", "o", "e"))
+    edges = lb.EdgeSet((a, b))
+    bits = {(a, "h"): 1, (a, "t"): 2, (a, "n"): 4, (b, "i"): 8, (b, "o"): 16}
+    bits[b, "e"] = 32
+    dct = trie.Node.from_keys(("hot", "hit", "hoot", "hitot", "ton", "tin"))
+
+    got = lb.buckets(edges.words(dct), bits)
+
+    # "hit", "hot" and "hoot" use only chars of "hitot" so are left out.
+    assert {
+        ends: {m: {"".join(c for _, c in w) for w in ws} for m, ws in bucket.items()}
+        for ends, bucket in got.items()
+    } == {
+        ("h", "t"): {1 | 2 | 8 | 16: {"hitot"}},
+        ("t", "n"): {2 | 4 | 8: {"tin"}, 2 | 4 | 16: {"ton"}},
+    }
+
+
+def test_fewest_letters() -> None:
+    dct = trie.Node.from_keys(("hit", "to", "one", "tone", "ton", "none", "hitone"))
+    edges = lb.EdgeSet((frozenset(("h", "t", "n")), frozenset(("i", "o", "e"))))
+
+    got = list(lb.solves(dct, edges, 5, 3, "letters"))
+
+    assert got == [("hitone",), ("hit", "tone"), ("hit", "to", "one")]
+    assert list(lb.solves(dct, edges, 5, 3, "both")) == got
+    assert list(lb.solves(dct, edges, 1, -1, "letters")) == [("hitone",)]
+
+
+def test_fewest_letters_unlimited() -> None:
+    dct = trie.Node.from_keys(
+        ("hit", "to", "one", "tone", "ton", "none", "hitone", "tot")
+    )
+    edges = lb.EdgeSet((frozenset(("h", "t", "n")), frozenset(("i", "o", "e"))))
+
+    got = list(lb.solves(dct, edges, 5, -1, "letters"))
+
+    # hit tot to is not expanded as hit to ends in the same char for fewer letters.
+    assert got == [
+        ("hitone",),
+        ("hit", "tone"),
+        ("hit", "to", "one"),
+        ("hit", "ton", "none"),
+        ("hit", "tot", "tone"),
+    ]
+
+
+def test_exhaust() -> None:
+    dct = trie.Node.from_keys(("hit", "to", "one", "tone", "ton", "none", "hitone"))
+    edges = lb.EdgeSet((frozenset(("h", "t", "n")), frozenset(("i", "o", "e"))))
+
+    got = list(lb.exhaust(dct, edges, 3))
+
+    assert {tuple("".join(c for _, c in w) for w in ws) for _, ws in got} == {
+        ("hitone",),
+        ("hit", "tone"),
+        ("hit", "to", "one"),
+        ("hit", "ton", "none"),
+    }
+    for i, (position, _) in enumerate(got):
+        after = i + 1
+        assert list(lb.exhaust(dct, edges, 3, position)) == got[after:]
+
+
+def test_fewest_letters_max_words() -> None:
+    dct = trie.Node.from_keys(
+        "cfcfd df dfgklk djifl dkf dl dlflf fik fili fj fjji fjkci fldi flikf gg ggdcj "
+        "gjk gkjffdk ifi ii iidfci ijdfl jgik jjd kdggklg kgcj kgifkf kiigk lc lcc ld "
+        "ldg lf".split()
+    )
+    edges = lb.EdgeSet(frozenset(edge) for edge in ("cl", "di", "fg", "jk"))
+
+    # Paths of fewer letters but more words must not prune those within max_words.
+    got = list(lb.solves(dct, edges, 3, 1, "letters"))
+
+    assert got == [("dlflf", "fik", "kgcj")]
+    assert len(next(lb.solves(dct, edges, 3, 1))) == 3
+
+
+def test_exhaust_unique() -> None:
+    dct = trie.Node.from_keys(("cab", "bad", "dab", "ab", "ba", "cd", "dc", "bc"))
+    edges = lb.EdgeSet(frozenset(edge) for edge in ("ab", "ac", "bd"))
+
+    # Chars on two edges spell some solutions more than one way.
+    got = [
+        tuple("".join(c for _, c in w) for w in ws)
+        for _, ws in lb.exhaust(dct, edges, 3)
+    ]
+
+    assert len(got) == len(set(got)) == 12
+    assert ("cab", "bad") in got
+
+
+def test_checkpoint(tmp_path: pathlib.Path) -> None:
+    words = tmp_path / "words.txt"
+    words.write_text("cab\nbad\ndab\nab\nba\ncd\ndc\nbc\n")
+    checkpoint = tmp_path / "ckpt"
+    args = ["-d", str(words), "--exhaustive", "--checkpoint", str(checkpoint), "3"]
+    runner = CliRunner()
+
+    result = runner.invoke(lb.cli, [*args, "ab", "ac", "bd"])
+    again = runner.invoke(lb.cli, [*args, "ab", "ac", "bd"])
+    other = runner.invoke(lb.cli, [*args, "ab", "ac", "cd"])
+
+    assert result.exit_code == 0 and result.output.count("\n(") == 12
+    assert again.exit_code == 0 and again.output.count("\n(") == 0
+    assert other.exit_code == 2 and "another search" in other.output
+    assert runner.invoke(lb.cli, [*args, "-o", "2", "ab", "ac"]).exit_code == 2
@@ -1,4 +1,5 @@
 from . import linear, trie
+from .conftest import Compile
 
 
 def test_solve() -> None:
@@ -35,3 +36,57 @@ def test_solve() -> None:
     got = set(linear.solve(dct, grid))
 
     assert want == got
+
+
+def test_scan() -> None:
+    dct = trie.Node.from_keys({"a", "at", "tab"})
+    grid = linear.Grid("tab", "axa")
+
+    got = set(linear.scan(dct, grid))
+
+    assert got == {
+        ((0, 0), (0, 1), 3),  # "tab"
+        ((0, 1), (0, -1), 2),  # "at"
+        ((0, 1), (0, 1), 1),  # "a"
+        ((1, 0), (-1, 0), 2),  # "at"
+        ((1, 0), (0, 1), 1),  # "a"
+        ((1, 2), (0, 1), 1),  # "a"
+    }
+    assert set(map(linear.cells, got)) == set(linear.solve(dct, grid))
+
+
+def test_automaton() -> None:
+    a = linear.Automaton(trie.Node.from_keys({"he", "she", "his", "hers"}))
+    got = set(a.matches("ushers"))
+    # she, he and hers start at 1, 2 and 2.
+    assert got == {(1, 3), (2, 2), (2, 4)}
+
+
+def test_search() -> None:
+    dct = trie.Node.from_keys({"a", "at", "tab", "bat", "tax"})
+    grid = linear.Grid("tab", "axa", "bat")
+    want = set(linear.scan(dct, grid))
+    assert set(linear.search(linear.Automaton(dct), grid)) == want
+
+
+def test_stream() -> None:
+    dct = trie.Node.from_keys({"a", "at", "tab", "bat", "tax", "taxa"})
+    rows = ["tabt", "axaa", "batx", "taxa", "abat"]
+    # The window is only as tall as the longest word.
+    assert dct.height < len(rows)
+
+    got = list(linear.stream(dct, rows))
+
+    assert {match for _, match in got} == set(linear.scan(dct, linear.Grid(*rows)))
+    for word, match in got:
+        assert word == "".join(rows[y][x] for y, x in linear.cells(match))
+
+
+def test_scan_parallel(compiled: Compile) -> None:
+    dictionary, dct = compiled(["a", "at", "bat", "tab", "tax", "taxa"])
+    grid = linear.Grid("tabtxa", "axaata", "batxbt", "taxaab", "abatxa")
+
+    # Tiles smaller than the longest word so words cross several of them.
+    got = list(linear.scan_parallel(dictionary, grid, dct.height, size=2, workers=2))
+
+    assert sorted(got) == sorted(linear.scan(dct, grid))
@@ -0,0 +1,60 @@
+import threading
+from pathlib import Path
+from typing import Any, Iterator, Tuple
+
+from pytest import fixture, mark, param, raises
+
+from . import boggle, client, server, spelling_bee, trie, wordiply
+
+KEYS = ("dog", "dig", "dug", "doge", "god", "goods")
+
+
+@fixture
+def address(tmp_path: Path) -> Iterator[str]:
+    address = str(tmp_path / "pyword.sock")
+    with server.Server(address, trie.Node.from_keys(KEYS)) as srv:
+        thread = threading.Thread(target=srv.serve_forever, args=(0.01,))
+        thread.start()
+        yield address
+        srv.shutdown()
+        thread.join()
+
+
+@mark.parametrize(
+    ["solver", "args", "want"],
+    [
+        param(
+            "boggle",
+            (
+                [
+                    ["d", "o"],
+                    ["g", "u"],
+                ],
+            ),
+            boggle.solve(
+                trie.Node.from_keys(KEYS),
+                boggle.Grid.from_rows(["do", "gu"]),
+            ),
+            id="boggle",
+        ),
+        param(
+            "spelling-bee",
+            ("dogie", "g"),
+            spelling_bee.solve(trie.Node.from_keys(KEYS), "dogie", "g"),
+            id="spelling_bee",
+        ),
+        param(
+            "wordiply",
+            ("og",),
+            wordiply.solve(trie.Node.from_keys(KEYS), "og"),
+            id="wordiply",
+        ),
+    ],
+)
+def test_call(address: str, solver: str, args: Tuple[Any, ...], want: Any) -> None:
+    assert set(client.call(address, solver, *args)) == set(want)
+
+
+def test_call_error(address: str) -> None:
+    with raises(client.ServerError):
+        list(client.call(address, "chess"))
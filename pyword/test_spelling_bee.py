@@ -1,10 +1,21 @@
-from typing import Iterable, Mapping
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping, Tuple
 
 from pytest import mark, param
 
 from . import spelling_bee as sb
 from . import trie
 
+Solve = Callable[[Iterable[str], str, str], Iterator[Tuple[str, int]]]
+
+
+def solve_trie(keys: Iterable[str], optional: str, required: str) -> Iterator:
+    return sb.solve(trie.Node.from_keys(keys), optional, required)
+
+
+def solve_index(keys: Iterable[str], optional: str, required: str) -> Iterator:
+    return sb.solve(sb.Index.from_words(keys), optional, required)
+
 
 @mark.parametrize(
     ["dct", "optional", "required", "want"],
@@ -39,10 +50,36 @@ from . import trie
         ),
     ],
 )
+@mark.parametrize("solve", [solve_trie, solve_index])
 def test_solve(
+    solve: Solve,
     dct: Iterable[str],
-    optional: Iterable[str],
-    required: Iterable[str],
+    optional: str,
+    required: str,
     want: Mapping[str, int],
 ) -> None:
-    assert dict(sb.solve(trie.Node.from_keys(dct), optional, required)) == want
+    assert dict(solve(dct, optional, required)) == want
+
+
+def test_index_dump(tmp_path: Path) -> None:
+    words = tmp_path / "words"
+    words.write_text("dog\ndig\ngod\ncat\nCat\n")
+
+    ix = sb.load_index(str(words))
+    assert (tmp_path / "words.bee").exists()
+    # Words of chars other than a-z are left out.
+    assert ix.words == {
+        sb.mask("dog"): ["dog", "god"],
+        sb.mask("dig"): ["dig"],
+        sb.mask("cat"): ["cat"],
+    }
+    assert sb.load_index(str(words)).words == ix.words
+
+
+def test_puzzles() -> None:
+    ix = sb.Index.from_words(["dogs", "gods", "godless", "lodge", "less"])
+    got = {(chars, c): score for chars, c, score in sb.puzzles(ix, size=6)}
+    # godless is the only pangram, worth 7 + 7.
+    assert got[("deglos", "d")] == 14 + 1 + 1 + 5
+    assert got[("deglos", "s")] == 14 + 1 + 1 + 1
+    assert len(got) == 6
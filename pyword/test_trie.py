@@ -19,12 +19,12 @@ class TestSet:
         tr.add(key)
         assert len(tr) == 1
         assert key in tr
-        # assert tr.size() == len(key)
+        assert tr.size() == len(key)
 
         tr.remove(key)
         assert len(tr) == 0
         assert key not in tr
-        # assert tr.size() == len(key)
+        assert tr.size() == len(key)
 
     def test_branch(self) -> None:
         keys = (tuple("branch"), tuple("brunch"))
@@ -37,7 +37,7 @@ class TestSet:
             tr.add(key)
             assert len(tr) == i
 
-        # assert tr.size() == 10
+        assert tr.size() == 10
         assert set(tr) == set(keys)
 
         for i, key in enumerate(keys, start=1):
@@ -45,4 +45,45 @@ class TestSet:
             tr.remove(key)
             assert len(tr) == len(keys) - i
 
-        # assert tr.size() == 10
+        assert tr.size() == 10
+
+
+class TestNode:
+    def test_counts(self) -> None:
+        u: trie.Node[str] = trie.Node()
+        for key in ("dog", "do", "dig", "dog"):
+            u.add(key)
+        assert len(u) == 3
+        assert u.size() == 5
+
+        v = u.node("d")
+        assert v is not None
+        assert len(v) == 3
+        assert v.size() == 4
+
+        assert u.height == 3
+        u.add("digger")
+        assert u.height == 6
+        assert v.height == 5
+        u.remove("digger")
+
+        u.remove("do")
+        u.remove("dot")
+        assert len(u) == 2
+        assert len(v) == 2
+        assert u.size() == 8
+
+    def test_words(self) -> None:
+        keys = ("dog", "cat", "do", "doge", "ca", "a")
+        u = trie.Node.from_keys(keys)
+
+        assert list(u.words(ordered=True)) == sorted(keys)
+        assert set(u.words()) == set(keys)
+        assert list(u.keys(ordered=True)) == [tuple(key) for key in sorted(keys)]
+
+    def test_walk(self) -> None:
+        u = trie.Node.from_keys(("ab", "ac"))
+
+        got = [("".join(w), v.ok) for w, v in u.walk(ordered=True)]
+
+        assert got == [("a", False), ("ab", True), ("ac", True)]
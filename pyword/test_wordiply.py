@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from pathlib import Path
+from typing import Set
+
+from pytest import MonkeyPatch, mark, param
+
+from . import compact, trie
+from . import wordiply as wp
+
+WORDS = ("rail", "trail", "railway", "trailer", "derailment", "rain", "ail")
+
+
+@mark.parametrize(
+    ["key", "want"],
+    [
+        param(
+            "rail",
+            {"rail", "trail", "railway", "trailer", "derailment"},
+            id="start_middle_end",
+        ),
+        param(
+            "ai",
+            {"rail", "trail", "railway", "trailer", "derailment", "rain", "ail"},
+            id="short",
+        ),
+        param("rails", set(), id="none"),
+    ],
+)
+def test_containing(key: str, want: Set[str]) -> None:
+    assert set(wp.containing(trie.Node.from_keys(WORDS), key)) == want
+    assert set(wp.containing(wp.Index(WORDS), key)) == want
+
+
+def test_solve() -> None:
+    assert wp.solve(wp.Index(WORDS), "rail", count=1) == ("derailment",)
+
+
+@mark.parametrize(
+    ["dct"],
+    [
+        param(trie.Node.from_keys(WORDS), id="trie"),
+        param(compact.Node.from_keys(WORDS), id="compact"),
+        param(wp.Index(WORDS), id="index"),
+    ],
+)
+@mark.parametrize("scan", [0.01, 0.5, 100], ids=["search", "partial", "scan"])
+def test_longest(
+    dct: trie.Node[str] | wp.Index, scan: float, monkeypatch: MonkeyPatch
+) -> None:
+    # Searches of fewer states per word fall back to a scan sooner.
+    monkeypatch.setattr(wp, "SCAN", scan)
+
+    got = list(wp.longest(dct, "rail"))
+
+    assert sorted(got) == sorted({"rail", "trail", "railway", "trailer", "derailment"})
+    assert [len(word) for word in got] == [10, 7, 7, 5, 4]
+
+
+def test_score() -> None:
+    assert wp.score(["trail", "railway"], max=10) == (Fraction(7, 10), 12)
+
+
+def test_index_dump(tmp_path: Path) -> None:
+    words = tmp_path / "words"
+    words.write_text("".join(f"{word}\n" for word in WORDS))
+
+    ix = wp.load_index(str(words))
+    assert (tmp_path / "words.wordiply").exists()
+    again = wp.load_index(str(words))
+
+    assert again.words == ix.words == wp.sort(sorted(WORDS))
+    assert again.grams == ix.grams
+    assert wp.solve(again, "rail") == wp.solve(ix, "rail")
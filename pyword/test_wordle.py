@@ -1,9 +1,11 @@
 from collections import Counter
+from pathlib import Path
 from typing import List
 
-from pytest import mark, param
+from pytest import importorskip, mark, param
 
 from . import wordle
+from .conftest import Compile
 
 
 @mark.parametrize(
@@ -122,3 +124,29 @@ def test_guess_answer(ans: str, guess: str, want: List[wordle.Answer.Result]) ->
 )
 def test_facts_possible(f: wordle.Facts, w: str, ok: bool) -> None:
     assert f.possible(w) is ok
+
+
+def test_feedback() -> None:
+    importorskip("numpy")
+    words = ["latte", "wheel", "hello", "youth", "earls", "solar", "rails", "llama"]
+
+    got = wordle.feedback(words, words[:5])
+
+    assert got.shape == (len(words), 5)
+    for i, guess in enumerate(words):
+        for j, ans in enumerate(words[:5]):
+            assert got[i, j] == wordle.code(wordle.Answer(ans).guess(guess))
+    assert got[1, 0] == wordle.code(wordle.Answer("latte").guess("wheel")) == 1 * 9 + 1
+
+
+def test_load_feedback(compiled: Compile) -> None:
+    importorskip("numpy")
+    dictionary, _ = compiled(["latte", "wheel", "hello", "be", "solar"])
+
+    words, codes = wordle.load_feedback(dictionary)
+    assert Path(f"{dictionary}.wordle5.npy").exists()
+    again, mapped = wordle.load_feedback(dictionary)
+
+    assert words == again == ["hello", "latte", "solar", "wheel"]
+    assert (mapped == wordle.feedback(words, words)).all()
+    assert (codes == mapped).all()
@@ -19,9 +19,18 @@ H = TypeVar("H", bound=Hashable)
 
 
 class Node(Generic[H]):
+    __slots__ = ("ok", "next", "height", "_len", "_size")
+
     def __init__(self) -> None:
         self.ok = False
         self.next: Dict[H, Node] = {}
+        # Length of the longest key below this one. Keys are not pruned when removed so
+        # after a remove this is only an upper bound.
+        self.height = 0
+        # Keys and nodes below this one, kept up to date by add and remove so that
+        # __len__ and size do not have to walk the trie.
+        self._len = 0
+        self._size = 0
 
     # Override __len__
     def __bool__(self) -> Literal[True]:
@@ -36,44 +45,91 @@ class Node(Generic[H]):
                 return None
         return u
 
+    def children(self, ordered: bool = False) -> Iterable[Tuple[H, Node[H]]]:
+        if ordered:
+            return sorted(self.next.items(), key=lambda cv: cv[0])  # type: ignore
+        return self.next.items()
+
+    def walk(self, ordered: bool = False) -> Iterator[Tuple[List[H], Node[H]]]:
+        """Yield the key and node of each node below this one, depth first.
+
+        The key is the same list each time, changed in place as the walk goes on, so
+        copy it to keep it. If ordered then keys are yielded in lexicographic order.
+        """
+        path: List[H] = []
+        todo = [iter(self.children(ordered))]
+        while todo:
+            for c, v in todo[-1]:
+                path.append(c)
+                yield path, v
+                if v.next:
+                    todo.append(iter(v.children(ordered)))
+                else:
+                    path.pop()
+                break
+            else:
+                todo.pop()
+                if path:
+                    path.pop()
+
     def nodes(self) -> Iterator[Tuple[Sequence[H], Node[H]]]:
-        s: List[Tuple[Tuple[H, ...], Node[H]]] = [
-            ((c,), u) for c, u in self.next.items()
-        ]
-        while s:
-            wu = s.pop()
-            yield wu
-            w, u = wu
-            for c, v in u.next.items():
-                s.append(((*w, c), v))
+        for w, u in self.walk():
+            yield tuple(w), u
 
     def add(self, key: Iterable[H]) -> None:
+        path: List[Node[H]] = []
+        new = 0
         u = self
         for c in key:
+            path.append(u)
             v = u.next.get(c)
             if not v:
                 v = Node()
                 u.next[c] = v
+                new += 1
             u = v
+        ok = not u.ok
         u.ok = True
+        if new or ok:
+            # The new nodes are the last on the path.
+            for i, v in enumerate(path):
+                v._size += min(new, len(path) - i)
+                v._len += ok
+                v.height = max(v.height, len(path) - i)
 
     def remove(self, key: Iterable[H]) -> None:
-        if v := self.node(key):
-            v.ok = False
+        path: List[Node[H]] = []
+        u = self
+        for c in key:
+            path.append(u)
+            if (v := u.next.get(c)) is None:
+                return
+            u = v
+        if u.ok:
+            u.ok = False
+            for v in path:
+                v._len -= 1
+
+    def keys(self, ordered: bool = False) -> Iterator[Sequence[H]]:
+        for w, u in self.walk(ordered):
+            if u.ok:
+                yield tuple(w)
 
-    def keys(self) -> Iterator[Sequence[H]]:
-        for w, n in self.nodes():
-            if n.ok:
-                yield w
+    def words(self: Node[str], ordered: bool = False) -> Iterator[str]:
+        for w, u in self.walk(ordered):
+            if u.ok:
+                yield "".join(w)
 
     def __len__(self) -> int:
-        return sum(1 for _ in self.keys())
+        return self._len
 
     def size(self) -> int:
-        return sum(1 for _ in self.nodes())
+        return self._size
 
     def search(self, key: Sequence[H]) -> Iterator[Tuple[Sequence[H], Node[H]]]:
-        for prefix, u in self.nodes():
+        if v := self.node(key):
+            yield tuple(key), v
+        for prefix, u in self.walk():
             if v := u.node(key):
                 yield (*prefix, *key), v
 
@@ -105,6 +161,9 @@ class Set(MutableSet[Sequence[H]]):
     def __len__(self) -> int:
         return len(self.root)
 
+    def size(self) -> int:
+        return self.root.size()
+
     def __iter__(self) -> Iterator[Sequence[H]]:
         return self.root.keys()
 
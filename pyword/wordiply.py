@@ -1,29 +1,221 @@
 from __future__ import annotations
 
+import itertools
+import struct
+import sys
+from array import array
 from fractions import Fraction
-from typing import Iterable, Iterator, List, Sequence, TextIO, Tuple
+from functools import lru_cache
+from heapq import heappop, heappush
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import click
 
-from . import trie
+from . import client, compact, trie
 
 
 def sort(keys: Iterable[str]) -> List[str]:
     return sorted(keys, key=len, reverse=True)
 
 
+# Index file format: MAGIC, HEADER, then the offsets of each n-gram's word ids and
+# the ids as little-endian arrays, then the words longest first and the n-grams in
+# order, each newline separated UTF-8.
+MAGIC = b"PYWORD\x00W"
+VERSION = 1
+HEADER = struct.Struct("<6I")
+
+
 def join(letters: Iterable[str]) -> str:
     return "".join(letters)
 
 
-def containing(dct: trie.Node[str], key: str) -> Iterator[str]:
+def ngrams(word: str, n: int) -> Iterator[str]:
+    for end in range(n, len(word) + 1):
+        start = end - n
+        yield word[start:end]
+
+
+class Index:
+    """Words by the n-grams they contain.
+
+    Words containing a key are found by checking only the words that contain the
+    key's rarest n-gram rather than every word. Words are kept longest first so they
+    are found longest first too.
+    """
+
+    def __init__(
+        self,
+        words: Iterable[str],
+        n: int = 3,
+        grams: Optional[Dict[str, array[int]]] = None,
+    ) -> None:
+        self.n = n
+        self.words = sort(words)
+        if grams is not None:
+            self.grams = grams
+            return
+        self.grams = {}
+        for i, word in enumerate(self.words):
+            for gram in set(ngrams(word, n)):
+                if (ids := self.grams.get(gram)) is None:
+                    ids = self.grams[gram] = array("I")
+                ids.append(i)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def candidates(self, key: str) -> Sequence[int]:
+        if len(key) < self.n:
+            # Most words contain short keys so checking them all costs little extra.
+            return range(len(self.words))
+        empty: array[int] = array("I")
+        return min(
+            (self.grams.get(gram, empty) for gram in ngrams(key, self.n)), key=len
+        )
+
+    def containing(self, key: str) -> Iterator[str]:
+        for i in self.candidates(key):
+            if key in (word := self.words[i]):
+                yield word
+
+    @classmethod
+    def from_trie(cls, dct: trie.Node[str]) -> Index:
+        return cls(dct.words())
+
+    def dump(self, f: BinaryIO) -> None:
+        grams = sorted(self.grams)
+        offsets = array("I", [0])
+        ids = array("I")
+        for gram in grams:
+            ids.extend(self.grams[gram])
+            offsets.append(len(ids))
+        words = "\n".join(self.words).encode()
+        text = "\n".join(grams).encode()
+        if sys.byteorder != "little":
+            offsets.byteswap()
+            ids.byteswap()
+        f.write(MAGIC)
+        f.write(
+            HEADER.pack(VERSION, self.n, len(grams), len(ids), len(words), len(text))
+        )
+        f.write(offsets.tobytes())
+        f.write(ids.tobytes())
+        f.write(words)
+        f.write(text)
+
+    @classmethod
+    def load(cls, f: BinaryIO) -> Index:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise compact.FormatError("not a wordiply index")
+        version, n, count, size, words_len, text_len = HEADER.unpack(
+            f.read(HEADER.size)
+        )
+        if version != VERSION:
+            raise compact.FormatError(f"unsupported version {version}: want {VERSION}")
+        offsets, ids = array("I"), array("I")
+        offsets.frombytes(f.read(4 * (count + 1)))
+        ids.frombytes(f.read(4 * size))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+            ids.byteswap()
+        words = f.read(words_len).decode().split("\n") if words_len else []
+        text = f.read(text_len).decode().split("\n") if text_len else []
+        grams = {}
+        for i, gram in enumerate(text):
+            start, end = offsets[i], offsets[i + 1]
+            grams[gram] = ids[start:end]
+        return cls(words, n, grams)
+
+
+def load_index(dictionary: str) -> Index:
+    """Load the index stored alongside a dictionary.
+
+    The index is built and stored first if there is none or it is older than the
+    dictionary.
+    """
+
+    def load(path: str) -> Index:
+        with open(path, "rb") as f:
+            return Index.load(f)
+
+    def store(path: str) -> None:
+        with open(path, "wb") as f:
+            Index.from_trie(compact.load(dictionary)).dump(f)
+
+    ix = compact.cached(dictionary, ".wordiply", load, store)
+    return ix or Index.from_trie(compact.load(dictionary))
+
+
+# Keep the index of the last dictionary the server was asked about.
+index = lru_cache(maxsize=1)(Index.from_trie)
+
+
+def containing(dct: trie.Node[str] | Index, key: str) -> Iterator[str]:
+    if isinstance(dct, Index):
+        yield from dct.containing(key)
+        return
     for seq, node in dct.search(key):
-        yield from map(lambda suffix: join((*seq, *suffix)), node.keys())
+        prefix = join(seq)
+        if node.ok:
+            yield prefix
+        for suffix in node.words():
+            yield prefix + suffix
+
+
+# Search states in the order to expand them when their bounds are equal.
+WORD, SUFFIX, PREFIX = range(3)
+
+# States the search of longest expands per word of the dictionary before a scan.
+SCAN = 16
+
 
+def longest(dct: trie.Node[str] | Index, key: str) -> Iterator[str]:
+    """Yield the words containing key, longest first.
+
+    Only as much of the dictionary is searched as is needed for the words taken,
+    unless key is so rare that scanning the whole of it is cheaper.
+    """
+    if isinstance(dct, Index):
+        yield from dct.containing(key)
+        return
+
+    # Search best first by the length of the longest word each state can lead to,
+    # found from node heights, so that no longer word is left when one is yielded.
+    todo: List[Tuple[int, int, int, str, Optional[trie.Node[str]]]] = []
+    order = itertools.count()
+
+    def push(bound: int, state: int, w: str, u: Optional[trie.Node[str]]) -> None:
+        heappush(todo, (-bound, state, next(order), w, u))
+
+    push(dct.height, PREFIX, "", dct)
+    seen = set()
+    budget = len(dct) // SCAN
+    while todo:
+        if (budget := budget - 1) < 0:
+            # The bounds are not pruning, so finish with a plain scan which costs
+            # less per word than the search.
+            yield from (w for w in sort(set(containing(dct, key))) if w not in seen)
+            return
+        _, state, _, w, u = heappop(todo)
+        if u is None:
+            # Words containing key more than once are found more than once.
+            if w not in seen:
+                seen.add(w)
+                yield w
+            continue
+        if state == PREFIX and (v := u.node(key)) is not None:
+            push(len(w) + len(key) + v.height, SUFFIX, w + key, v)
+        if state == SUFFIX and u.ok:
+            push(len(w), WORD, w, None)
+        for c, x in u.next.items():
+            push(len(w) + 1 + x.height, state, w + c, x)
 
-def solve(dct: trie.Node[str], contains: str, count: int = 5) -> Tuple[str, ...]:
-    words = sort(containing(dct, contains))
-    return tuple(words[:count])
+
+def solve(
+    dct: trie.Node[str] | Index, contains: str, count: int = 5
+) -> Tuple[str, ...]:
+    return tuple(itertools.islice(longest(dct, contains), count))
 
 
 def score(
@@ -42,27 +234,37 @@ def score(
 
 @click.command()
 @click.option(
-    "dct", "--dictionary", "-d", type=click.File("r"), envvar="PYWORD_DICTIONARY"
+    "dct",
+    "--dictionary",
+    "-d",
+    type=click.Path(exists=True, dir_okay=False),
+    envvar="PYWORD_DICTIONARY",
 )
+@click.option("--server", type=click.Path(), envvar="PYWORD_SERVER")
 @click.argument("contains")
-def cli(dct: TextIO | None, contains: str) -> None:
-    if dct is None:
-        raise Exception("no dictionary provided")
-
-    click.echo("loading dictionary...", err=True, nl=False)
-    tr = trie.Node.from_keys(word.strip() for word in dct)
-    click.echo(f" ok ({len(tr)} words, {tr.size()} nodes)", err=True)  # type: ignore
+@click.argument("guesses", nargs=-1)
+def cli(
+    dct: str | None, server: str | None, contains: str, guesses: Tuple[str, ...]
+) -> None:
+    if server:
+        words = tuple(client.call(server, "wordiply", contains))
+    else:
+        if dct is None:
+            raise Exception("no dictionary provided")
 
-    words = solve(tr, contains)
+        click.echo("loading index...", err=True, nl=False)
+        ix = load_index(dct)
+        click.echo(f" ok ({len(ix)} words)", err=True)
+        words = solve(ix, contains)
     if not words:
         return
 
-    letters = sum(len(word) for word in words)
-
-    print(words[0], len(words[0]))
-    for word in words[1:]:
+    for word in words:
         print(word, len(word))
-    print(f"({letters})")
+
+    # The longest word found is the longest possible so score any guesses against it.
+    length, letters = score(guesses or words, max=len(words[0]))
+    print(f"({letters} letters, {float(length):.0%} length)")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,14 @@
+from __future__ import annotations
+
 from collections import Counter
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Dict, List, Set
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import compact
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class SizeError(Exception):
@@ -52,3 +59,101 @@ class Facts:
             if n[c] > i:
                 return False
         return True
+
+
+def code(results: Sequence[Answer.Result]) -> int:
+    """Number results in base 3, first most significant, NO as 0, POS 1 and YES 2."""
+    n = 0
+    for r in results:
+        n = 3 * n + r.value - Answer.Result.NO.value
+    return n
+
+
+def code_type(size: int) -> np.dtype:
+    import numpy as np
+
+    return np.min_scalar_type(3**size - 1)
+
+
+# Guess and answer letter pairs compared at a time by feedback.
+BLOCK = 1 << 22
+
+
+def feedback(
+    guesses: Sequence[str], answers: Sequence[str], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Code the results of every guess for every answer, one guess per row.
+
+    Needs numpy. Words are encoded as arrays of letter numbers and compared a block of
+    guesses at a time against all the answers at once. As in Answer.guess a letter
+    not in its place is POS only while the guess has had fewer of it before than the
+    answer has.
+    """
+    import numpy as np
+
+    size = len(guesses[0]) if guesses else len(answers[0]) if answers else 0
+    for w in (*guesses, *answers):
+        if len(w) != size:
+            raise SizeError(f"word size {len(w)} != size {size}")
+    alphabet = sorted({*"".join(guesses), *"".join(answers)})
+    if len(alphabet) > 256:
+        raise ValueError(f"{len(alphabet)} letters do not fit in a byte")
+    table = {ord(c): i for i, c in enumerate(alphabet)}
+
+    def encode(words: Sequence[str]) -> np.ndarray:
+        letters = "".join(words).translate(table).encode("latin-1")
+        return np.frombuffer(letters, dtype=np.uint8).reshape(len(words), size)
+
+    g, a = encode(guesses), encode(answers)
+    # Letters of the answers and times each has each letter, answers last so rows of
+    # a guess letter are contiguous.
+    letters = np.ascontiguousarray(a.T)
+    counts = np.zeros((len(alphabet), len(answers)), dtype=np.uint8)
+    np.add.at(counts, (a, np.arange(len(answers))[:, None]), 1)
+    # Times each guess has each of its letters before it.
+    earlier = np.tri(size, k=-1, dtype=bool)
+    before = ((g[:, :, None] == g[:, None, :]) & earlier).sum(2, dtype=np.uint8)
+
+    dtype = code_type(size)
+    if out is None:
+        out = np.empty((len(guesses), len(answers)), dtype=dtype)
+    step = max(1, BLOCK // max(len(answers) * size, 1))
+    for start in range(0, len(guesses), step):
+        end = start + step
+        block = g[start:end]
+        yes = block[:, :, None] == letters
+        pos = before[start:end, :, None] < counts[block]
+        digits = np.where(yes, 2, pos.view(np.uint8)).astype(dtype, copy=False)
+        codes = np.zeros((len(block), len(answers)), dtype=dtype)
+        for i in range(size):
+            codes *= 3
+            codes += digits[:, i]
+        out[start:end] = codes
+    return out
+
+
+def load_feedback(dictionary: str, size: int = 5) -> Tuple[List[str], np.ndarray]:
+    """Load the words of size in a dictionary and the feedback of every pair of them.
+
+    The feedback is stored alongside the dictionary and memory mapped, so only the rows
+    read are loaded. It is computed and stored first if there is none or it is older
+    than the dictionary.
+    """
+    import numpy as np
+
+    words = [w for w in compact.load(dictionary).words(ordered=True) if len(w) == size]
+    shape = len(words), len(words)
+
+    def load(path: str) -> Optional[np.ndarray]:
+        codes = np.load(path, mmap_mode="r")
+        return codes if codes.shape == shape else None
+
+    def store(path: str) -> None:
+        out = np.lib.format.open_memmap(
+            path, mode="w+", dtype=code_type(size), shape=shape
+        )
+        feedback(words, words, out)
+        out.flush()
+
+    codes = compact.cached(dictionary, f".wordle{size}.npy", load, store)
+    return words, feedback(words, words) if codes is None else codes